@@ -0,0 +1,62 @@
+# Loaded automatically by gunicorn when started from the project directory.
+import multiprocessing
+import os
+
+from decouple import config
+
+bind = config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = config('GUNICORN_WORKERS', default=multiprocessing.cpu_count() * 2 + 1, cast=int)
+# Recycle workers now and then; preloading keeps their replacements cheap
+max_requests = config('GUNICORN_MAX_REQUESTS', default=5000, cast=int)
+max_requests_jitter = config('GUNICORN_MAX_REQUESTS_JITTER', default=500, cast=int)
+
+# Import the project once in the master so workers fork from a warmed-up copy
+preload_app = config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+
+def on_starting(server):
+    # Per-process caches would give each worker its own throttle counters
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hotel_reservation.settings')
+    import django
+    from django.core.exceptions import ImproperlyConfigured
+
+    django.setup()
+    from hotel.throttling import check_shared_cache
+
+    try:
+        check_shared_cache(server.cfg.workers)
+    except ImproperlyConfigured as exc:
+        # gunicorn reports a RuntimeError and exits
+        raise RuntimeError(str(exc)) from exc
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before the first fork
+    if not server.cfg.preload_app:
+        return
+    from django.db import DatabaseError
+    from hotel.warmup import warm_up
+
+    try:
+        timings = warm_up()
+    except DatabaseError as exc:
+        # The steps before the failure still ran; workers connect on their own
+        server.log.warning("Warm-up could not connect to the database: %s", exc)
+        return
+    server.log.info("Warm-up done: %s", ", ".join(
+        f"{step} {seconds * 1000:.0f}ms" for step, seconds in timings.items()
+    ))
+
+
+def post_fork(server, worker):
+    # Connections are per process, so each worker opens its own
+    if not server.cfg.preload_app:
+        return
+    from django.db import DatabaseError
+    from hotel.warmup import open_connections
+
+    try:
+        open_connections()
+    except DatabaseError as exc:
+        # The first request will retry; don't keep the worker from booting
+        server.log.warning("Worker %s could not connect to the database: %s", worker.pid, exc)
@@ -1,26 +1,118 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
-from .models import RoomType, Room, Guest, Booking
+from django.core.exceptions import ValidationError
+from django.db import models, router
+from django.http import QueryDict
+from .models import OTHER_PROPERTY_ERROR, Property, RoomType, Room, Guest, Booking
+
+
+class PropertyScopedForm(forms.ModelForm):
+    def clean(self):
+        # Before the instance is built: a row from another property's
+        # database can't even be assigned to it
+        cleaned_data = super().clean()
+        hotel = cleaned_data.get('hotel')
+        if hotel is not None:
+            for name, value in list(cleaned_data.items()):
+                if isinstance(value, models.Model) and getattr(value, 'hotel_id', hotel.pk) != hotel.pk:
+                    self.add_error(name, OTHER_PROPERTY_ERROR)
+        return cleaned_data
+
+
+class PropertyScopedAdmin(admin.ModelAdmin):
+    """
+    Admin for rows kept on their property's database (see PropertyRouter).
+
+    Lists read from the database of the property picked in the "By hotel"
+    filter, and from the catalog database until one is picked. A single row
+    is looked up on every database, and the choices for its room type, room
+    or guest come from its own property. To add a row to a property on
+    another database, open the add form from that property's filtered list
+    (or pass ?hotel=<property id>).
+
+    The property itself is prefetched from the catalog rather than joined,
+    as it isn't on the property's database; list_select_related must not
+    name it.
+    """
+    form = PropertyScopedForm
+    list_select_related = []
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).prefetch_related('hotel')
+        hotel = self.requested_property(request)
+        if hotel is not None:
+            queryset = queryset.using(router.db_for_read(self.model, instance=hotel))
+        return queryset
+
+    def get_object(self, request, object_id, from_field=None):
+        field = self.model._meta.pk if from_field is None else self.model._meta.get_field(from_field)
+        queryset = self.get_queryset(request)
+        for database in settings.DATABASES:
+            try:
+                return queryset.using(database).get(**{field.name: object_id})
+            except (self.model.DoesNotExist, ValidationError, ValueError):
+                continue
+        return None
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name != 'hotel':
+            hotel = self.form_property(request)
+            if hotel is not None:
+                kwargs['queryset'] = db_field.related_model._default_manager.using(
+                    router.db_for_read(db_field.related_model, instance=hotel)
+                ).filter(hotel=hotel)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def requested_property(self, request):
+        # The add button of a filtered list passes the filter on as _changelist_filters
+        filters = QueryDict(request.GET.get('_changelist_filters', ''))
+        hotel_id = (request.GET.get('hotel__id__exact') or request.GET.get('hotel')
+                    or filters.get('hotel__id__exact'))
+        if not hotel_id:
+            return None
+        try:
+            return Property.objects.get(pk=hotel_id)
+        except (Property.DoesNotExist, ValidationError):
+            return None
+
+    def form_property(self, request):
+        """The property of the row being edited, or the one the add form was opened for"""
+        object_id = request.resolver_match.kwargs.get('object_id')
+        if object_id is not None:
+            obj = self.get_object(request, object_id)
+            return obj.hotel if obj is not None else None
+        return self.requested_property(request)
+
+
+@admin.register(Property)
+class PropertyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'code', 'database']
+    search_fields = ['name', 'code']
 
 @admin.register(RoomType)
-class RoomTypeAdmin(admin.ModelAdmin):
-    list_display = ['name', 'base_price', 'max_occupancy']
-    list_filter = ['max_occupancy']
+class RoomTypeAdmin(PropertyScopedAdmin):
+    list_display = ['name', 'hotel', 'base_price', 'max_occupancy']
+    list_filter = ['hotel', 'max_occupancy']
     search_fields = ['name']
 
 @admin.register(Room)
-class RoomAdmin(admin.ModelAdmin):
-    list_display = ['room_number', 'room_type', 'floor_number', 'status']
-    list_filter = ['room_type', 'status', 'floor_number']
+class RoomAdmin(PropertyScopedAdmin):
+    list_display = ['room_number', 'hotel', 'room_type', 'floor_number', 'status']
+    list_select_related = ['room_type']
+    list_filter = ['hotel', 'room_type', 'status', 'floor_number']
     search_fields = ['room_number']
 
 @admin.register(Guest)
-class GuestAdmin(admin.ModelAdmin):
-    list_display = ['first_name', 'last_name', 'email', 'phone']
+class GuestAdmin(PropertyScopedAdmin):
+    list_display = ['first_name', 'last_name', 'email', 'phone', 'hotel']
+    list_filter = ['hotel']
     search_fields = ['first_name', 'last_name', 'email']
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(PropertyScopedAdmin):
     list_display = ['id', 'guest', 'room', 'check_in_date', 'check_out_date', 'status', 'total_amount']
-    list_filter = ['status', 'check_in_date']
+    list_select_related = ['guest', 'room']
+    list_filter = ['hotel', 'status', 'check_in_date']
     search_fields = ['guest__first_name', 'guest__last_name', 'room__room_number']
     readonly_fields = ['id', 'nights']
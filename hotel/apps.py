@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class HotelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'hotel'
\ No newline at end of file
+    name = 'hotel'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, Exists, OuterRef
+
+from .models import Booking
+
+# Booking statuses that hold a room for their date range
+BLOCKING_STATUSES = ['confirmed', 'checked_in']
+
+
+def booked_intervals(hotel, rooms, start, end):
+    """Map room id to its sorted (check_in, check_out) bookings overlapping [start, end)"""
+    bookings = hotel.bookings.filter(
+        room__in=rooms,
+        status__in=BLOCKING_STATUSES,
+        check_in_date__lt=end,
+        check_out_date__gt=start,
+    ).order_by('room_id', 'check_in_date').values_list('room_id', 'check_in_date', 'check_out_date')
+
+    intervals = defaultdict(list)
+    for room_id, check_in, check_out in bookings:
+        intervals[room_id].append((check_in, check_out))
+    return intervals
+
+
+def free_gaps(intervals, start, end):
+    """Yield the free (gap_start, gap_end) periods inside [start, end) between sorted intervals"""
+    cursor = start
+    for booked_in, booked_out in intervals:
+        if booked_in > cursor:
+            yield cursor, min(booked_in, end)
+        cursor = max(cursor, booked_out)
+        if cursor >= end:
+            return
+    if cursor < end:
+        yield cursor, end
+
+
+def flexible_windows(hotel, rooms, earliest_start, latest_start, nights):
+    """
+    Find every stay of `nights` starting between earliest_start and latest_start
+    that some room can take, grouped by room type.
+
+    Bookings are fetched once and swept per room, so the cost does not grow
+    with the number of candidate dates. Returns a list of
+    (room_type, {check_in: [room_id, ...]}) pairs.
+    """
+    stay = timedelta(days=nights)
+    horizon_end = latest_start + stay
+    intervals = booked_intervals(hotel, rooms, earliest_start, horizon_end)
+
+    room_types = {}
+    windows = defaultdict(lambda: defaultdict(list))
+    for room in rooms:
+        room_types[room.room_type_id] = room.room_type
+        for gap_start, gap_end in free_gaps(intervals[room.id], earliest_start, horizon_end):
+            day = gap_start
+            last = min(gap_end - stay, latest_start)
+            while day <= last:
+                windows[room.room_type_id][day].append(room.id)
+                day += timedelta(days=1)
+
+    return [(room_types[type_id], starts) for type_id, starts in windows.items()]
+
+
+def available_rooms(hotel, check_in, check_out):
+    """Rooms open for sale with no blocking booking overlapping [check_in, check_out)"""
+    overlapping = Booking.objects.filter(
+        hotel_id=OuterRef('hotel_id'),
+        room=OuterRef('pk'),
+        status__in=BLOCKING_STATUSES,
+        check_in_date__lt=check_out,
+        check_out_date__gt=check_in,
+    )
+    return hotel.rooms.filter(status='available').filter(~Exists(overlapping))
+
+
+def availability_by_type(hotel, check_in, check_out):
+    """Return (room_type, available_room_count) pairs for the date range"""
+    counts = dict(
+        available_rooms(hotel, check_in, check_out)
+        .order_by()
+        .values('room_type')
+        .annotate(available=Count('id'))
+        .values_list('room_type', 'available')
+    )
+    room_types = hotel.room_types.filter(id__in=counts.keys())
+    return [(room_type, counts[room_type.id]) for room_type in room_types]
+
+
+def cheapest_allocation(options, guests, max_rooms):
+    """
+    Pick how many rooms of each type to book so that `guests` people fit in at
+    most `max_rooms` rooms at the lowest total base price, using as few rooms
+    as possible among equally cheap choices.
+
+    `options` is a list of (room_type, available_count) pairs. This is a
+    bounded knapsack over (rooms used, seats), with seats capped at `guests`.
+    Each type's availability is split into 1, 2, 4, ... room bundles, so the
+    work is O(types * log(available) * max_rooms * guests) however the prices
+    compare. Returns a list of (room_type, count) pairs, or None when the
+    party cannot be placed.
+    """
+    options = sorted(
+        [(room_type, available) for room_type, available in options
+         if room_type.max_occupancy > 0 and available > 0],
+        key=lambda option: option[0].base_price / option[0].max_occupancy
+    )
+    if guests <= 0:
+        return []
+    # An extra room never seats fewer than one more guest, so more than `guests` rooms never help
+    max_rooms = min(max_rooms, guests)
+
+    # best[rooms][seats] is (cost, choices) for the cheapest way to use exactly
+    # `rooms` rooms seating `seats` guests (capped at `guests`). choices is a
+    # linked list of (option index, count, rest) so entries share their tails.
+    best = [[None] * (guests + 1) for _ in range(max_rooms + 1)]
+    best[0][0] = (0, None)
+
+    for index, (room_type, available) in enumerate(options):
+        for count in bundle_sizes(min(available, max_rooms)):
+            price = count * room_type.base_price
+            seated = count * room_type.max_occupancy
+            # Rooms descending, so every bundle is used at most once
+            for rooms in range(max_rooms - count, -1, -1):
+                row, target_row = best[rooms], best[rooms + count]
+                for seats, entry in enumerate(row):
+                    if entry is None:
+                        continue
+                    target = min(seats + seated, guests)
+                    cost = entry[0] + price
+                    current = target_row[target]
+                    if current is None or cost < current[0]:
+                        target_row[target] = (cost, (index, count, entry[1]))
+
+    cheapest = None
+    for rooms in range(max_rooms + 1):
+        entry = best[rooms][guests]
+        if entry is not None and (cheapest is None or entry[0] < cheapest[0]):
+            cheapest = entry
+    if cheapest is None:
+        return None
+
+    counts = defaultdict(int)
+    choice = cheapest[1]
+    while choice is not None:
+        index, count, choice = choice
+        counts[index] += count
+    return [(options[index][0], counts[index]) for index in sorted(counts)]
+
+
+def bundle_sizes(limit):
+    """Split limit into 1, 2, 4, ... and a remainder, which sum to any count up to limit"""
+    size = 1
+    while limit > 0:
+        yield min(size, limit)
+        limit -= size
+        size *= 2
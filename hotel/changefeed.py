@@ -0,0 +1,150 @@
+import base64
+
+from django.db import connections
+from django.db.models import BigIntegerField, Func, Q
+from rest_framework.exceptions import ValidationError
+
+from .serializers import RoomTypeSerializer, RoomSerializer, GuestSerializer, BookingSerializer
+
+# Feed model name -> (Property related manager, select_related, serializer)
+FEED_MODELS = {
+    'booking': ('bookings', ['guest', 'room', 'room__room_type'], BookingSerializer),
+    'room': ('rooms', ['room_type'], RoomSerializer),
+    # Rooms and bookings nest their room type; clients refresh those copies from here
+    'room_type': ('room_types', [], RoomTypeSerializer),
+    'guest': ('guests', [], GuestSerializer),
+}
+
+
+def current_transaction_id(using):
+    """
+    Value for ChangeLogEntry.transaction_id: an expression evaluated by
+    PostgreSQL inside the writing transaction. Other backends (SQLite)
+    commit one writer at a time, so ids already follow commit order there.
+    """
+    if connections[using].vendor == 'postgresql':
+        return Func(function='txid_current', output_field=BigIntegerField())
+    return 0
+
+
+def committed_watermark(using):
+    """
+    Transaction id below which every transaction has finished, or None
+    where writers are serialized. Entries with a lower transaction_id can
+    all be seen; no entry with a lower one can still appear.
+
+    Transaction ids are shared by every database on the server, so any
+    transaction left open there, by this project or not, holds the
+    watermark back and stops every property's feed until it ends. The
+    changefeed_lag command shows the transactions doing so.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT txid_snapshot_xmin(txid_current_snapshot())')
+        return cursor.fetchone()[0]
+
+
+def encode_cursor(position):
+    transaction_id, entry_id = position
+    return base64.urlsafe_b64encode(f'v2:{transaction_id}:{entry_id}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (transaction_id, entry_id) position a cursor points at"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        version, *position = base64.urlsafe_b64decode(padded).decode().split(':')
+        if version != 'v2' or len(position) != 2:
+            raise ValueError(version)
+        return int(position[0]), int(position[1])
+    except ValueError:
+        raise ValidationError({'cursor': ['Invalid cursor.']})
+
+
+def feed_entries(hotel, after):
+    """Change log entries after the (transaction_id, entry_id) position, in feed order"""
+    transaction_id, entry_id = after
+    entries = hotel.changes.filter(
+        Q(transaction_id__gt=transaction_id) | Q(transaction_id=transaction_id, id__gt=entry_id)
+    )
+    watermark = committed_watermark(entries.db)
+    if watermark is not None:
+        entries = entries.filter(transaction_id__lt=watermark)
+    return entries.order_by('transaction_id', 'id')
+
+
+def changes_since(hotel, after, limit):
+    """
+    Return (changes, last_position, has_more) for the property's change log
+    entries after the `after` position, oldest first, with the current state
+    of every changed row.
+
+    Each object appears once per page, at the position of its newest entry.
+    Entries are paged by (transaction_id, id) and only up to the committed
+    watermark, so an entry whose transaction commits late is never behind a
+    position a client has already been given, however long it ran.
+    """
+    entries = list(feed_entries(hotel, after)[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return [], after, False
+
+    changes = [
+        {
+            'model': entry.model,
+            'id': entry.object_id,
+            'action': action,
+            'changed_at': entry.changed_at,
+            'data': data,
+        }
+        for entry, action, data in latest_changes(hotel, entries)
+    ]
+    return changes, (entries[-1].transaction_id, entries[-1].id), has_more
+
+
+def latest_changes(hotel, entries):
+    """
+    Return (entry, action, data) for the newest of the entries about each
+    object, in feed order, with the object's current serialized state (None
+    once it is deleted). An object created within the entries is reported
+    as created.
+    """
+    latest = {}
+    created = set()
+    for entry in entries:
+        key = (entry.model, entry.object_id)
+        if entry.action == 'created':
+            created.add(key)
+        latest.pop(key, None)
+        latest[key] = entry
+
+    ids_by_model = {}
+    for (model, object_id), entry in latest.items():
+        if entry.action != 'deleted':
+            ids_by_model.setdefault(model, []).append(object_id)
+
+    # One query per model for the current state of the changed rows
+    rows = {}
+    for model, ids in ids_by_model.items():
+        manager, related, serializer_class = FEED_MODELS[model]
+        queryset = getattr(hotel, manager).filter(pk__in=ids)
+        if related:
+            queryset = queryset.select_related(*related)
+        for obj in queryset:
+            rows[(model, obj.pk)] = serializer_class(obj).data
+
+    changes = []
+    for key, entry in latest.items():
+        data = rows.get(key)
+        if data is None:
+            # Deleted, possibly by an entry not read yet
+            action = 'deleted'
+        elif key in created:
+            action = 'created'
+        else:
+            action = entry.action
+        changes.append((entry, action, data))
+    return changes
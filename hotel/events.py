@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+import json
+import logging
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import Error, connections
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+from .changefeed import decode_cursor, encode_cursor, feed_entries, latest_changes
+
+logger = logging.getLogger(__name__)
+
+
+class Event:
+    def __init__(self, id, type, data, position=None):
+        self.id = id
+        self.type = type
+        self.data = data
+        # (transaction_id, entry_id) of the change log entry behind the event
+        self.position = position
+
+    def encode(self):
+        """Server-Sent Events wire format"""
+        data = json.dumps(self.data, cls=JSONEncoder)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {data}\n\n"
+
+
+def change_event(entry, action, data):
+    """The stream event for a change feed entry, or None if streams leave its model out"""
+    position = (entry.transaction_id, entry.id)
+    if entry.model == 'room':
+        if action == 'deleted':
+            event_type, payload = 'room.deleted', {'room_id': entry.object_id}
+        else:
+            event_type = 'room.status'
+            payload = {'room_id': data['id'], 'room_number': data['room_number'], 'status': data['status']}
+    elif entry.model == 'booking':
+        event_type = f'booking.{action}'
+        if action == 'deleted':
+            payload = {'booking_id': entry.object_id}
+        else:
+            payload = {
+                'booking_id': data['id'],
+                'room_id': data['room']['id'],
+                'guest_id': data['guest']['id'],
+                'status': data['status'],
+                'check_in_date': data['check_in_date'],
+                'check_out_date': data['check_out_date'],
+            }
+    else:
+        return None
+    return Event(encode_cursor(position), event_type, payload, position)
+
+
+def read_events(hotel, after, until=None, limit=1000):
+    """
+    Return (events, position, has_more) for the property's change log
+    entries after the `after` position, and up to `until` if given, at
+    most `limit` entries at a time.
+    """
+    entries = feed_entries(hotel, after)
+    if until is not None:
+        entries = entries.filter(
+            Q(transaction_id__lt=until[0]) | Q(transaction_id=until[0], id__lte=until[1])
+        )
+    entries = list(entries[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return [], after, False
+
+    events = [change_event(*change) for change in latest_changes(hotel, entries)]
+    return [event for event in events if event is not None], (entries[-1].transaction_id, entries[-1].id), has_more
+
+
+def end_of_log(hotel):
+    """Position of the property's newest committed change log entry"""
+    entry = feed_entries(hotel, (0, 0)).last()
+    return (0, 0) if entry is None else (entry.transaction_id, entry.id)
+
+
+class Subscription:
+    """
+    One connected stream. A subscriber that falls more than max_pending
+    events behind is marked overflowed and should disconnect; it can resume
+    from its last event id.
+    """
+
+    def __init__(self, hub, hotel_id, position, backlog, reset, max_pending):
+        self.hub = hub
+        self.hotel_id = hotel_id
+        # Events at or before this position were delivered already
+        self.position = position
+        self.reset = reset
+        self.overflowed = False
+        self.queue = asyncio.Queue(maxsize=max(max_pending, len(backlog)))
+        for event in backlog:
+            self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        if event.position <= self.position:
+            # Resumed from an id this process's log position hasn't reached yet
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.close()
+
+    async def get(self, timeout):
+        """Next event, or None if nothing arrived within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class PropertyFeed:
+    def __init__(self, hotel, position):
+        self.hotel = hotel
+        self.position = position
+        self.subscribers = set()
+
+
+class EventHub:
+    """
+    Streams room and booking changes to the subscriptions of one event
+    loop. The changes are read from the change log (see hotel.changefeed)
+    every poll_interval seconds, one query per property with subscribers,
+    so a stream sees every committed change whichever process made it:
+    another worker, the importer, the admin or a script.
+
+    Event ids are change feed cursors, so a client can resume from its
+    Last-Event-ID on any process. If it missed more than max_pending
+    changes, or its id is not a cursor, it gets reset=True, meaning it
+    should reload its state.
+    """
+
+    def __init__(self, poll_interval=1, max_pending=1000):
+        self.poll_interval = poll_interval
+        self.max_pending = max_pending
+        self._lock = asyncio.Lock()
+        self._feeds = {}
+        self._poller = None
+
+    async def subscribe(self, hotel, last_event_id=None):
+        # Under the lock, so no poll moves the property's position while
+        # the backlog up to it is read
+        async with self._lock:
+            feed = self._feeds.get(hotel.id)
+            if feed is None:
+                feed = PropertyFeed(hotel, await sync_to_async(end_of_log)(hotel))
+                self._feeds[hotel.id] = feed
+
+            position, backlog, reset = feed.position, [], False
+            if last_event_id:
+                try:
+                    after = decode_cursor(last_event_id)
+                except ValidationError:
+                    reset = True
+                else:
+                    if after < feed.position:
+                        backlog, _, reset = await sync_to_async(read_events)(
+                            hotel, after, feed.position, self.max_pending
+                        )
+                        if reset:
+                            backlog = []
+                    else:
+                        position = after
+
+            subscription = Subscription(self, hotel.id, position, backlog, reset, self.max_pending)
+            feed.subscribers.add(subscription)
+            if self._poller is None or self._poller.done():
+                # In a context of its own rather than the request's, whose
+                # thread its queries would otherwise run on and outlive
+                loop = asyncio.get_running_loop()
+                self._poller = contextvars.Context().run(loop.create_task, self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        feed = self._feeds.get(subscription.hotel_id)
+        if feed is None:
+            return
+        feed.subscribers.discard(subscription)
+        if not feed.subscribers:
+            del self._feeds[subscription.hotel_id]
+
+    def subscriber_count(self, hotel_id):
+        feed = self._feeds.get(hotel_id)
+        return 0 if feed is None else len(feed.subscribers)
+
+    async def _poll(self):
+        # Ends once no property has subscribers; the next subscribe restarts it
+        while self._feeds:
+            await asyncio.sleep(self.poll_interval)
+            async with self._lock:
+                for feed in list(self._feeds.values()):
+                    await self._poll_feed(feed)
+
+    async def _poll_feed(self, feed):
+        has_more = True
+        while has_more:
+            try:
+                events, feed.position, has_more = await sync_to_async(read_events)(
+                    feed.hotel, feed.position, None, self.max_pending
+                )
+            except Error:
+                logger.exception("Could not read the change log of property %s", feed.hotel.code)
+                # Reconnect at the next poll
+                await sync_to_async(connections.close_all)()
+                return
+            for event in events:
+                for subscription in list(feed.subscribers):
+                    subscription.deliver(event)
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """The hub of the running event loop"""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = EventHub(
+            poll_interval=getattr(settings, 'EVENT_HUB_POLL_SECONDS', 1),
+            max_pending=getattr(settings, 'EVENT_HUB_MAX_PENDING', 1000),
+        )
+    return hub
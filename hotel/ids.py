@@ -0,0 +1,45 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """
+    Time-ordered UUID (version 7, RFC 9562) for primary key defaults.
+
+    The first 48 bits are the Unix time in milliseconds, so new rows are
+    appended at the right edge of the primary key index instead of at a
+    random position. The next 12 bits are a counter that starts at a random
+    value every millisecond, which keeps ids from one process strictly
+    increasing. The remaining 62 bits are random.
+    """
+    global _last_ms, _counter
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Leave headroom so the counter rarely overflows within a millisecond
+            _counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), 'big') & 0x3FFFFFFFFFFFFFFF
+    value = (
+        (timestamp & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0x2 << 62
+        | rand_b
+    )
+    return uuid.UUID(int=value)
@@ -0,0 +1,397 @@
+import bisect
+import csv
+import json
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, router, transaction
+
+from .availability import BLOCKING_STATUSES
+from .changefeed import current_transaction_id
+from .models import Guest, Booking, ChangeLogEntry
+
+GUEST_FIELDS = {
+    'guest_first_name': 'first_name',
+    'guest_last_name': 'last_name',
+    'guest_phone': 'phone',
+    'guest_nationality': 'nationality',
+}
+BOOKING_STATUSES = {value for value, label in Booking.STATUS_CHOICES}
+# Largest value of a PositiveIntegerField on every backend (PostgreSQL's integer)
+MAX_INTEGER = 2147483647
+# Tries per batch when another import stores the same references or guests first
+BATCH_ATTEMPTS = 3
+
+
+class RowError(Exception):
+    pass
+
+
+def text(row, field):
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def read_csv(stream):
+    """Yield (row_number, row) for each data row of a CSV file with a header line"""
+    for row_number, row in enumerate(csv.DictReader(stream), start=1):
+        yield row_number, row
+
+
+def read_ndjson(stream):
+    """Yield (row_number, row) for each non-blank line; unparseable lines yield a RowError"""
+    row_number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            row = RowError(f"Invalid JSON: {exc}")
+        else:
+            if not isinstance(row, dict):
+                row = RowError("Each line must be a JSON object")
+        yield row_number, row
+
+
+class RoomStays:
+    """
+    The blocking stays of one room, sorted by check-in, with the latest
+    check-out seen so far at each position. Stored bookings may overlap each
+    other (rows written before the overlap checks, or by hand), so the
+    check-out of the last stay starting before a date is not enough: a long
+    stay can reach past shorter ones that start after it.
+    """
+
+    def __init__(self):
+        self.check_ins = []
+        self.reach = []
+
+    def overlaps(self, check_in, check_out):
+        """Whether [check_in, check_out) overlaps any stay"""
+        index = bisect.bisect_left(self.check_ins, check_out)
+        return index > 0 and self.reach[index - 1] > check_in
+
+    def append(self, check_in, check_out):
+        """Add a stay starting no earlier than every stay added so far"""
+        self.check_ins.append(check_in)
+        self.reach.append(max(check_out, self.reach[-1]) if self.reach else check_out)
+
+    def add(self, check_in, check_out):
+        """Add a stay that overlaps none of the stays, anywhere in the order"""
+        index = bisect.bisect_right(self.check_ins, check_in)
+        self.check_ins.insert(index, check_in)
+        # Stays before it end by check_in and stays after it start at check_out or
+        # later, so neither side's reach changes
+        self.reach.insert(index, check_out)
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.rejected = []
+        self.last_row = 0
+        # The run stopped at max_rows; run again with start_after=last_row
+        self.has_more = False
+
+    def reject(self, row_number, reason, row):
+        self.rejected.append({'row': row_number, 'reason': reason, 'data': row})
+
+    def as_dict(self):
+        return {
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'rejected_count': len(self.rejected),
+            'rejected': self.rejected,
+            'last_row': self.last_row,
+            'has_more': self.has_more,
+        }
+
+
+class BookingImporter:
+    """
+    Imports channel manager reservations for one property in batches.
+
+    Rooms are loaded once into a room_number map. Each batch then costs a
+    fixed number of queries: one for already imported references, one for
+    overlapping bookings, three to upsert guests by email, and bulk inserts
+    for bookings and change log entries, all in one transaction. Rows whose
+    external_reference was imported before are skipped, so a failed or
+    interrupted import can simply be run again. A batch whose insert
+    collides with rows another import committed in the meantime is checked
+    and written again, so two uploads of one file don't fail each other.
+    """
+
+    def __init__(self, hotel, batch_size=1000):
+        self.hotel = hotel
+        self.batch_size = batch_size
+        self.db = router.db_for_write(Booking, instance=hotel)
+        self.rooms = {
+            room.room_number: room
+            for room in hotel.rooms.select_related('room_type')
+        }
+
+    def run(self, rows, start_after=0, on_batch=None, max_rows=None):
+        """
+        Import (row_number, row) pairs, skipping rows up to start_after and
+        stopping after max_rows more. on_batch(result) is called after each
+        batch commits.
+        """
+        result = ImportResult()
+        batch = []
+        taken = 0
+        for row_number, row in rows:
+            if row_number <= start_after:
+                continue
+            if max_rows is not None and taken >= max_rows:
+                result.has_more = True
+                break
+            taken += 1
+            batch.append((row_number, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch, result)
+                batch = []
+                if on_batch:
+                    on_batch(result)
+        if batch:
+            self.import_batch(batch, result)
+            if on_batch:
+                on_batch(result)
+        return result
+
+    def import_batch(self, batch, result):
+        cleaned = []
+        for row_number, row in batch:
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                cleaned.append((row_number, row, self.clean_row(row)))
+            except RowError as exc:
+                result.reject(row_number, str(exc), None if isinstance(row, RowError) else row)
+        result.last_row = batch[-1][0]
+
+        for _ in range(BATCH_ATTEMPTS):
+            # Rows skipped or rejected by this attempt; kept only if it commits
+            checked = ImportResult()
+            rows = self.drop_known_references(cleaned, checked)
+            rows = self.drop_overlapping(rows, checked)
+            try:
+                if rows:
+                    self.insert_rows(rows)
+            except IntegrityError:
+                # Another import committed some of the batch's references or
+                # guests after they were checked; check again against them
+                continue
+            result.imported += len(rows)
+            result.skipped += checked.skipped
+            result.rejected += checked.rejected
+            return
+
+        for row_number, row, _ in cleaned:
+            result.reject(row_number, "Conflicts with an import running at the same time; import the file again.", row)
+
+    def insert_rows(self, cleaned):
+        with transaction.atomic(using=self.db):
+            guests = self.upsert_guests([data for _, _, data in cleaned])
+            bookings = [
+                Booking(
+                    hotel=self.hotel,
+                    guest_id=guests[data['email']],
+                    **{key: value for key, value in data.items() if key not in ('email', 'guest')}
+                )
+                for _, _, data in cleaned
+            ]
+            Booking.objects.using(self.db).bulk_create(bookings)
+            ChangeLogEntry.objects.using(self.db).bulk_create([
+                self.log_entry('booking', booking, 'created')
+                for booking in bookings
+            ])
+
+    def log_entry(self, model, obj, action):
+        return ChangeLogEntry(
+            hotel=self.hotel, model=model, object_id=obj.id, action=action,
+            transaction_id=current_transaction_id(self.db),
+        )
+
+    def clean_row(self, row):
+        room = self.rooms.get(text(row, 'room_number'))
+        if room is None:
+            raise RowError(f"Unknown room: {row.get('room_number')!r}")
+
+        check_in = self.parse_date(row, 'check_in_date')
+        check_out = self.parse_date(row, 'check_out_date')
+        if check_out <= check_in:
+            raise RowError("Check-out date must be after check-in date.")
+
+        adults = self.parse_int(row, 'adults', default=1)
+        children = self.parse_int(row, 'children', default=0)
+        if adults < 1 or children < 0:
+            raise RowError("A booking needs at least one adult and no negative guest counts.")
+
+        status = text(row, 'status') or 'confirmed'
+        if status not in BOOKING_STATUSES:
+            raise RowError(f"Unknown status: {status!r}")
+
+        email = self.parse_text(row, 'guest_email', Guest, 'email')
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise RowError(f"Invalid guest email: {email!r}")
+
+        total_amount = text(row, 'total_amount')
+        if not total_amount:
+            total_amount = room.room_type.base_price * (check_out - check_in).days
+        else:
+            try:
+                total_amount = Decimal(total_amount)
+            except InvalidOperation:
+                raise RowError(f"Invalid total_amount: {total_amount!r}")
+        self.check_amount(total_amount)
+
+        return {
+            'room': room,
+            'check_in_date': check_in,
+            'check_out_date': check_out,
+            'adults': adults,
+            'children': children,
+            'status': status,
+            'total_amount': total_amount,
+            'special_requests': text(row, 'special_requests'),
+            'external_reference': self.parse_text(row, 'external_reference', Booking, 'external_reference'),
+            'email': email,
+            'guest': {
+                field: self.parse_text(row, column, Guest, field)
+                for column, field in GUEST_FIELDS.items()
+            },
+        }
+
+    def parse_date(self, row, field):
+        try:
+            return date.fromisoformat(text(row, field))
+        except ValueError:
+            raise RowError(f"Invalid {field}: {row.get(field)!r}")
+
+    def parse_int(self, row, field, default):
+        value = text(row, field)
+        if not value:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise RowError(f"Invalid {field}: {value!r}")
+        # Checked here on every backend: SQLite accepts any integer until it
+        # overflows, and then the insert fails for the whole batch
+        if number > MAX_INTEGER:
+            raise RowError(f"Invalid {field}: {value!r}")
+        return number
+
+    def parse_text(self, row, column, model, field):
+        value = text(row, column)
+        max_length = model._meta.get_field(field).max_length
+        if len(value) > max_length:
+            raise RowError(f"{column} is longer than {max_length} characters.")
+        return value
+
+    def check_amount(self, amount):
+        """Reject amounts the total_amount column can't store: NaN, infinity, too many digits"""
+        try:
+            Booking._meta.get_field('total_amount').run_validators(amount)
+        except ValidationError as exc:
+            raise RowError(f"Invalid total_amount: {str(amount)!r}. {' '.join(exc.messages)}")
+        if amount < 0:
+            raise RowError(f"Invalid total_amount: {str(amount)!r}. It must not be negative.")
+
+    def drop_known_references(self, cleaned, result):
+        references = {data['external_reference'] for _, _, data in cleaned if data['external_reference']}
+        known = set(
+            self.hotel.bookings.filter(external_reference__in=references)
+            .values_list('external_reference', flat=True)
+        ) if references else set()
+
+        kept, seen = [], set()
+        for row_number, row, data in cleaned:
+            reference = data['external_reference']
+            if reference in known:
+                result.skipped += 1
+            elif reference and reference in seen:
+                result.reject(row_number, f"Duplicate external_reference {reference!r} in file", row)
+            else:
+                seen.add(reference)
+                kept.append((row_number, row, data))
+        return kept
+
+    def drop_overlapping(self, cleaned, result):
+        """Reject rows overlapping a stored booking or an earlier row, with one query per batch"""
+        blocking = [item for item in cleaned if item[2]['status'] in BLOCKING_STATUSES]
+        if not blocking:
+            return cleaned
+
+        taken = defaultdict(RoomStays)
+        existing = self.hotel.bookings.filter(
+            room__in={data['room'].id for _, _, data in blocking},
+            status__in=BLOCKING_STATUSES,
+            check_in_date__lt=max(data['check_out_date'] for _, _, data in blocking),
+            check_out_date__gt=min(data['check_in_date'] for _, _, data in blocking),
+        ).order_by('room_id', 'check_in_date').values_list('room_id', 'check_in_date', 'check_out_date')
+        for room_id, check_in, check_out in existing:
+            taken[room_id].append(check_in, check_out)
+
+        kept = []
+        for row_number, row, data in cleaned:
+            if data['status'] in BLOCKING_STATUSES:
+                stay = (data['check_in_date'], data['check_out_date'])
+                stays = taken[data['room'].id]
+                if stays.overlaps(*stay):
+                    result.reject(row_number, "Room is not available for selected dates.", row)
+                    continue
+                stays.add(*stay)
+            kept.append((row_number, row, data))
+        return kept
+
+    def upsert_guests(self, rows):
+        """Create or update the batch's guests by email and return an email -> id map"""
+        incoming = {}
+        for data in rows:
+            details = incoming.setdefault(data['email'], {})
+            # Like the booking API, blank values never overwrite stored details
+            details.update({field: value for field, value in data['guest'].items() if value})
+
+        existing = {guest.email: guest for guest in self.hotel.guests.filter(email__in=incoming)}
+        new_guests, changed_guests, changed_fields = [], [], set()
+        for email, details in incoming.items():
+            guest = existing.get(email)
+            if guest is None:
+                new_guests.append(Guest(hotel=self.hotel, email=email, **details))
+                continue
+            changed = {field for field, value in details.items() if getattr(guest, field) != value}
+            if changed:
+                for field in changed:
+                    setattr(guest, field, details[field])
+                changed_guests.append(guest)
+                changed_fields |= changed
+
+        Guest.objects.using(self.db).bulk_create(new_guests)
+        if changed_guests:
+            # Only the changed columns, which keeps the generated CASE expressions small
+            Guest.objects.using(self.db).bulk_update(changed_guests, sorted(changed_fields))
+        ChangeLogEntry.objects.using(self.db).bulk_create(
+            [self.log_entry('guest', guest, 'created')
+             for guest in new_guests] +
+            [self.log_entry('guest', guest, 'updated')
+             for guest in changed_guests]
+        )
+
+        guests = {guest.email: guest.id for guest in new_guests}
+        guests.update({email: guest.id for email, guest in existing.items()})
+        return guests
@@ -0,0 +1,110 @@
+import gzip
+import json
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from hotel.models import RoomType, Room, Guest, Booking
+from hotel.renderers import FastJSONRenderer, MessagePackRenderer, orjson, msgpack
+from hotel.serializers import BookingListSerializer, RoomSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = "Compare bytes and time per response of the JSON and MessagePack renderers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Items per list response")
+        parser.add_argument('--repeat', type=int, default=20, help="Renders per measurement")
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        rooms, bookings = self.build_objects(rows)
+        payloads = {
+            'rooms': RoomSerializer(rooms, many=True).data,
+            'bookings': BookingListSerializer(bookings, many=True).data,
+        }
+
+        renderers = [('json (stdlib)', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('json (orjson)', FastJSONRenderer()))
+        if msgpack is not None:
+            renderers.append(('msgpack', MessagePackRenderer()))
+
+        compressors = [('none', None), ('gzip', lambda body: gzip.compress(body, compresslevel=6))]
+        if brotli is not None:
+            compressors.append(('br', lambda body: brotli.compress(body, quality=4)))
+
+        self.stdout.write(f"{rows} items per response, best of {repeat} renders\n")
+        self.stdout.write(f"{'payload':<10}{'renderer':<16}{'encoding':<10}{'bytes':>10}{'ms':>10}  identical")
+        for payload_name, data in payloads.items():
+            expected = json.loads(JSONRenderer().render(data))
+            for renderer_name, renderer in renderers:
+                body = renderer.render(data)
+                identical = self.decode(renderer, body) == expected
+                for encoding, compress in compressors:
+                    def render():
+                        content = renderer.render(data)
+                        return compress(content) if compress else content
+                    size = len(render())
+                    elapsed = self.best_time(render, repeat)
+                    self.stdout.write(
+                        f"{payload_name:<10}{renderer_name:<16}{encoding:<10}"
+                        f"{size:>10}{elapsed * 1000:>10.2f}  {'yes' if identical else 'NO'}"
+                    )
+
+    def decode(self, renderer, body):
+        if isinstance(renderer, MessagePackRenderer):
+            return msgpack.unpackb(body, raw=False)
+        return json.loads(body)
+
+    def best_time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def build_objects(self, rows):
+        """Unsaved model instances, so the benchmark needs no database rows"""
+        room_types = [
+            RoomType(
+                id=uuid.uuid4(), name=f"Type {i}", description="Spacious room with a view ✓",
+                base_price=Decimal('89.00') + i * 30, max_occupancy=2 + i % 3,
+                amenities=["WiFi", "TV", "Air Conditioning", "Mini Bar"]
+            )
+            for i in range(4)
+        ]
+        rooms = [
+            Room(
+                id=uuid.uuid4(), room_number=str(100 + i), room_type=room_types[i % 4],
+                floor_number=1 + i // 50, status='available'
+            )
+            for i in range(rows)
+        ]
+        now = timezone.now()
+        bookings = []
+        for i, room in enumerate(rooms):
+            guest = Guest(
+                id=uuid.uuid4(), first_name="Guest", last_name=f"Number {i}",
+                email=f"guest{i}@example.com", phone="+1-555-0100", nationality="Cambodian"
+            )
+            check_in = date.today() + timedelta(days=i % 30)
+            bookings.append(Booking(
+                id=uuid.uuid4(), guest=guest, room=room, check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=3), adults=2, children=i % 2,
+                total_amount=room.room_type.base_price * 3, status='confirmed',
+                booking_date=now
+            ))
+        return rooms, bookings
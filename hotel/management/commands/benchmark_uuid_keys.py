@@ -0,0 +1,80 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections, transaction
+
+from hotel.ids import uuid7
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BaseCommand):
+    help = "Compare insert throughput and primary key index size of uuid4 and uuid7 keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Rows inserted per key type")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f"Unsupported database vendor: {connection.vendor}")
+
+        rows, batch_size = options['rows'], options['batch_size']
+        self.stdout.write(f"{rows} rows per key type on {connection.vendor}, batches of {batch_size}\n")
+        self.stdout.write(f"{'key':<8}{'rows/s':>12}{'seconds':>10}{'index bytes':>14}")
+
+        for name, generate in GENERATORS.items():
+            table = f'benchmark_{name}_keys'
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE IF EXISTS {table}')
+                cursor.execute(self.create_table_sql(connection, table))
+                try:
+                    elapsed = self.insert_rows(connection, cursor, table, generate, rows, batch_size)
+                    index_size = self.index_size(connection, cursor, table)
+                finally:
+                    cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+            self.stdout.write(
+                f"{name:<8}{rows / elapsed:>12.0f}{elapsed:>10.2f}"
+                f"{index_size if index_size is not None else 'n/a':>14}"
+            )
+
+    def create_table_sql(self, connection, table):
+        # Same key storage as Django's UUIDField on each backend
+        id_type = 'uuid' if connection.vendor == 'postgresql' else 'char(32)'
+        return f'CREATE TABLE {table} (id {id_type} PRIMARY KEY, payload integer NOT NULL)'
+
+    def insert_rows(self, connection, cursor, table, generate, rows, batch_size):
+        to_db = str if connection.vendor == 'postgresql' else (lambda value: value.hex)
+        sql = f'INSERT INTO {table} (id, payload) VALUES (%s, %s)'
+
+        elapsed = 0
+        for start in range(0, rows, batch_size):
+            batch = [(to_db(generate()), i) for i in range(start, min(start + batch_size, rows))]
+            began = time.perf_counter()
+            with transaction.atomic(using=connection.alias):
+                cursor.executemany(sql, batch)
+            elapsed += time.perf_counter() - began
+        return elapsed
+
+    def index_size(self, connection, cursor, table):
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_relation_size(%s)', [f'{table}_pkey'])
+            return cursor.fetchone()[0]
+
+        # SQLite names the implicit primary key index sqlite_autoindex_<table>_1
+        try:
+            cursor.execute(
+                'SELECT SUM(pgsize) FROM dbstat WHERE name = %s',
+                [f'sqlite_autoindex_{table}_1']
+            )
+        except DatabaseError:
+            # dbstat is an optional SQLite extension
+            return None
+        return cursor.fetchone()[0]
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from hotel.changefeed import committed_watermark
+
+# Transactions holding an id, oldest first: the first one is what the
+# watermark waits for. Prepared transactions hold it back as well.
+OPEN_TRANSACTIONS_SQL = """
+    SELECT pid::text, datname, application_name, state, EXTRACT(EPOCH FROM now() - xact_start)
+    FROM pg_stat_activity WHERE backend_xid IS NOT NULL
+    UNION ALL
+    SELECT 'prepared ' || gid, database, '', 'prepared', EXTRACT(EPOCH FROM now() - prepared)
+    FROM pg_prepared_xacts
+    ORDER BY 5 DESC
+    LIMIT %s
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how far the change feed's committed watermark trails the newest transaction, "
+        "and the open transactions on the server holding it back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', action='append', help="Database alias (default: all)")
+        parser.add_argument('--limit', type=int, default=5, help="Open transactions listed per database")
+        parser.add_argument(
+            '--max-seconds', type=float,
+            help="Exit with an error when a transaction has held the watermark longer than this",
+        )
+
+    def handle(self, *args, **options):
+        stalled = []
+        for alias in options['database'] or connections:
+            connection = connections[alias]
+            watermark = committed_watermark(alias)
+            if watermark is None:
+                self.stdout.write(f"{alias}: writers are serialized, the feed never waits")
+                continue
+
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT txid_snapshot_xmax(txid_current_snapshot())')
+                behind = cursor.fetchone()[0] - watermark
+                cursor.execute(OPEN_TRANSACTIONS_SQL, [options['limit']])
+                open_transactions = cursor.fetchall()
+
+            self.stdout.write(f"{alias}: watermark {watermark}, {behind} transaction ids behind")
+            for pid, database, application, state, seconds in open_transactions:
+                self.stdout.write(
+                    f"  {pid:<12} {database or '-':<20} {application or '-':<20} {state or '-':<22} {seconds:.1f}s"
+                )
+            if open_transactions and options['max_seconds'] is not None:
+                oldest = float(open_transactions[0][4])
+                if oldest > options['max_seconds']:
+                    stalled.append(f"{alias} ({oldest:.0f}s)")
+
+        if stalled:
+            raise CommandError(f"Change feed held back by an open transaction on {', '.join(stalled)}")
@@ -0,0 +1,75 @@
+import csv
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hotel.importers import READERS, BookingImporter
+from hotel.models import Property
+
+
+class Command(BaseCommand):
+    help = "Import a channel manager CSV or NDJSON reservation file into a property"
+
+    def add_arguments(self, parser):
+        parser.add_argument('property', help="Property code")
+        parser.add_argument('path', help="CSV (with header) or NDJSON file")
+        parser.add_argument('--format', choices=sorted(READERS), help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--resume', action='store_true',
+            help="Continue after the last batch committed by a previous run of this file"
+        )
+        parser.add_argument('--report', help="Write rejected rows to this CSV file")
+
+    def handle(self, *args, **options):
+        try:
+            hotel = Property.objects.get(code=options['property'])
+        except Property.DoesNotExist:
+            raise CommandError(f"Unknown property: {options['property']}")
+
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f"Cannot tell the file format of {path}; pass --format")
+
+        # Row number of the last committed batch, so an interrupted run can resume
+        checkpoint_path = f'{path}.checkpoint'
+        start_after = 0
+        if options['resume'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as checkpoint:
+                start_after = json.load(checkpoint)['last_row']
+            self.stdout.write(f"Resuming after row {start_after}")
+
+        def save_checkpoint(result):
+            with open(checkpoint_path, 'w') as checkpoint:
+                json.dump({'last_row': result.last_row}, checkpoint)
+            self.stdout.write(
+                f"  row {result.last_row}: {result.imported} imported, "
+                f"{result.skipped} skipped, {len(result.rejected)} rejected"
+            )
+
+        importer = BookingImporter(hotel, batch_size=options['batch_size'])
+        with open(path, newline='', encoding='utf-8-sig') as stream:
+            try:
+                result = importer.run(READERS[file_format](stream), start_after, on_batch=save_checkpoint)
+            except UnicodeDecodeError as exc:
+                raise CommandError(f"{path} is not valid UTF-8 ({exc}); fix it and run again with --resume")
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        if options['report'] and result.rejected:
+            self.write_report(options['report'], result.rejected)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.imported} bookings, skipped {result.skipped} already imported, "
+            f"rejected {len(result.rejected)}"
+        ))
+
+    def write_report(self, path, rejected):
+        with open(path, 'w', newline='', encoding='utf-8') as report:
+            writer = csv.writer(report)
+            writer.writerow(['row', 'reason', 'data'])
+            for rejection in rejected:
+                writer.writerow([rejection['row'], rejection['reason'], json.dumps(rejection['data'])])
+        self.stdout.write(f"Rejected rows written to {path}")
@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter, the way a newly forked or recycled worker starts
+PROBE = """
+import asyncio, importlib, json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+options = json.loads(sys.argv[1])
+started = time.perf_counter()
+module, _, name = options['application'].rpartition('.')
+application = getattr(importlib.import_module(module), name)
+report = {'load': time.perf_counter() - started, 'warm_up': None, 'requests': []}
+
+if options['warm_up']:
+    from hotel.warmup import warm_up
+    report['warm_up'] = warm_up()
+
+def wsgi_request(path):
+    environ = {'REQUEST_METHOD': 'GET'}
+    environ['PATH_INFO'], _, environ['QUERY_STRING'] = path.partition('?')
+    setup_testing_defaults(environ)
+    status = []
+    response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        for chunk in response:
+            pass
+    finally:
+        getattr(response, 'close', lambda: None)()
+    return status[0].split()[0]
+
+async def asgi_request(path):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    body_sent = False
+    status = []
+
+    async def receive():
+        nonlocal body_sent
+        if body_sent:
+            # The client stays connected until the response is complete
+            await asyncio.Future()
+        body_sent = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return str(status[0])
+
+# One event loop for the process, as under uvicorn
+loop = asyncio.new_event_loop()
+
+def request(path):
+    began = time.perf_counter()
+    if options['interface'] == 'asgi':
+        code = loop.run_until_complete(asgi_request(path))
+    else:
+        code = wsgi_request(path)
+    return code, time.perf_counter() - began
+
+for path in options['paths']:
+    code, first = request(path)
+    if 'first_response' not in report:
+        # From the launch of the process, interpreter start-up included
+        report['first_response'] = time.time() - options['launched']
+    _, second = request(path)
+    report['requests'].append({'path': path, 'status': code, 'first': first, 'second': second})
+
+print(json.dumps(report))
+"""
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)$')
+
+
+class Command(BaseCommand):
+    help = "Report the slowest imports and the time to first response of a freshly started worker"
+
+    # The WSGI application is what the API's gunicorn workers serve; the
+    # ASGI one is the separate process serving the event stream
+    applications = {
+        'wsgi': 'WSGI_APPLICATION',
+        'asgi': 'ASGI_APPLICATION',
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help="Request path to time; repeat for several (default: /api/properties). "
+                 "Streaming paths such as /events would only finish when the stream ends."
+        )
+        parser.add_argument(
+            '--interface', choices=sorted(self.applications), default='wsgi',
+            help="Profile the WSGI application of the API workers or the ASGI one of the event stream"
+        )
+        parser.add_argument('--top', type=int, default=20, help="Number of slowest imports to list")
+        parser.add_argument(
+            '--sort', choices=['cumulative', 'self'], default='cumulative',
+            help="Rank imports by time including or excluding their own imports"
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/api/properties']
+
+        application = getattr(settings, self.applications[options['interface']])
+        cold, import_times = self.probe(application, options['interface'], paths, warm_up=False)
+        warm, _ = self.probe(application, options['interface'], paths, warm_up=True)
+
+        self.stdout.write(f"Profiling {application}\n")
+        self.write_imports(import_times, options['top'], options['sort'])
+        self.write_startup('Cold worker', cold)
+        self.write_startup('Preloaded and warmed up', warm)
+
+    def probe(self, application, interface, paths, warm_up):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        options = json.dumps({
+            'application': application,
+            'interface': interface,
+            'paths': paths,
+            'warm_up': warm_up,
+            'launched': time.time(),
+        })
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE, options],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{result.stderr[-2000:]}")
+
+        import_times = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_TIME.match(line)
+            if match:
+                import_times.append((int(match[1]), int(match[2]), match[3]))
+        return json.loads(result.stdout.strip().splitlines()[-1]), import_times
+
+    def write_imports(self, import_times, top, sort):
+        key = (lambda item: item[1]) if sort == 'cumulative' else (lambda item: item[0])
+        total = sum(self_us for self_us, _, _ in import_times)
+        self.stdout.write(f"{len(import_times)} modules imported in {total / 1000:.0f}ms; slowest by {sort} time:")
+        self.stdout.write(f"{'self ms':>9}{'cumul. ms':>11}  module")
+        for self_us, cumulative_us, module in sorted(import_times, key=key, reverse=True)[:top]:
+            self.stdout.write(f"{self_us / 1000:>9.1f}{cumulative_us / 1000:>11.1f}  {module}")
+
+    def write_startup(self, title, report):
+        self.stdout.write(f"\n{title}:")
+        self.stdout.write(f"  {'load application':<22}{report['load'] * 1000:>8.1f}ms")
+        if report['warm_up'] is not None:
+            for step, seconds in report['warm_up'].items():
+                self.stdout.write(f"  {'warm-up ' + step:<22}{seconds * 1000:>8.1f}ms")
+        for request in report['requests']:
+            self.stdout.write(
+                f"  {request['path']} ({request['status']}): first request {request['first'] * 1000:.1f}ms, "
+                f"then {request['second'] * 1000:.1f}ms"
+            )
+        self.stdout.write(
+            f"  first response {report['first_response'] * 1000:.1f}ms after the process started"
+        )
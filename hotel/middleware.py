@@ -0,0 +1,113 @@
+import asyncio
+import re
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_gzip = re.compile(r'\bgzip\b')
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+# API bodies only; HTML pages such as the admin's carry CSRF tokens, which
+# compression would expose to BREACH
+COMPRESSIBLE_TYPES = ('application/json', 'application/msgpack')
+
+
+class CompressionMiddleware:
+    """
+    Opt-in response compression, enabled with RESPONSE_COMPRESSION = True.
+
+    Responses of at least RESPONSE_COMPRESSION_MIN_SIZE bytes are compressed
+    with brotli when the client accepts it and the package is installed,
+    otherwise with gzip. Smaller responses are sent as they are, since
+    compressing them costs more CPU than it saves in bytes. Only API
+    responses (COMPRESSIBLE_TYPES) are compressed, and gzip output gets
+    Django's random-length filename header as GZipMiddleware does.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'RESPONSE_COMPRESSION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and re_accepts_brotli.search(accept_encoding):
+            encoding, compressed = 'br', brotli.compress(response.content, quality=4)
+        elif re_accepts_gzip.search(accept_encoding):
+            encoding, compressed = 'gzip', compress_string(response.content, max_random_bytes=100)
+        else:
+            return response
+
+        # Return the uncompressed body if compression didn't help
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+
+        # The body changed, so a strong ETag no longer applies
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+
+        return response
+
+
+class DisconnectWatcher:
+    """
+    ASGI middleware that notices when a client goes away while its response
+    is still streaming. Django 4.2 stops reading the receive channel once
+    the request body is in, so a long-lived stream never hears about the
+    disconnect. Once the body has been read, this keeps listening and sets
+    the asyncio.Event in scope['disconnected'] on http.disconnect.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.application(scope, receive, send)
+
+        disconnected = asyncio.Event()
+        watcher = None
+
+        async def watch():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        async def receive_body():
+            nonlocal watcher
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+            elif not message.get('more_body', False):
+                watcher = asyncio.create_task(watch())
+            return message
+
+        try:
+            await self.application(dict(scope, disconnected=disconnected), receive_body, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
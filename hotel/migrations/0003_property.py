@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0002_changelogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Property',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('code', models.SlugField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('database', models.CharField(default='default', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Properties',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='hotel',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='hotel.property'),
+        ),
+        migrations.AddField(
+            model_name='changelogentry',
+            name='hotel',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='hotel.property'),
+        ),
+        migrations.AddField(
+            model_name='guest',
+            name='hotel',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='guests', to='hotel.property'),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='hotel',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rooms', to='hotel.property'),
+        ),
+        migrations.AddField(
+            model_name='roomtype',
+            name='hotel',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='room_types', to='hotel.property'),
+        ),
+    ]
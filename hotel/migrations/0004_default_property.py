@@ -0,0 +1,29 @@
+from django.db import migrations
+
+SCOPED_MODELS = ['RoomType', 'Room', 'Guest', 'Booking', 'ChangeLogEntry']
+
+
+def assign_default_property(apps, schema_editor):
+    """Move rows created before multi-property support into a 'main' property"""
+    db_alias = schema_editor.connection.alias
+    models = [apps.get_model('hotel', name) for name in SCOPED_MODELS]
+    if not any(model.objects.using(db_alias).filter(hotel__isnull=True).exists() for model in models):
+        return
+
+    Property = apps.get_model('hotel', 'Property')
+    main, _ = Property.objects.using(db_alias).get_or_create(
+        code='main', defaults={'name': 'Main Property', 'database': db_alias}
+    )
+    for model in models:
+        model.objects.using(db_alias).filter(hotel__isnull=True).update(hotel=main)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0003_property'),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_default_property, migrations.RunPython.noop),
+    ]
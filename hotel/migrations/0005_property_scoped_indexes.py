@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0004_default_property'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='hotel',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='hotel.property'),
+        ),
+        migrations.AlterField(
+            model_name='changelogentry',
+            name='hotel',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='hotel.property'),
+        ),
+        migrations.AlterField(
+            model_name='guest',
+            name='email',
+            field=models.EmailField(max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='guest',
+            name='hotel',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='guests', to='hotel.property'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='hotel',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='rooms', to='hotel.property'),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='room_number',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='roomtype',
+            name='hotel',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='room_types', to='hotel.property'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['hotel', 'room', 'check_in_date', 'check_out_date'], name='booking_hotel_overlap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['hotel', '-created_at'], name='booking_hotel_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['hotel', 'id'], name='changelog_hotel_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['hotel', 'last_name', 'first_name'], name='guest_hotel_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(fields=['hotel', 'status', 'room_number'], name='room_hotel_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roomtype',
+            index=models.Index(fields=['hotel', 'name'], name='roomtype_hotel_name_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='guest',
+            constraint=models.UniqueConstraint(fields=('hotel', 'email'), name='unique_guest_email_per_hotel'),
+        ),
+        migrations.AddConstraint(
+            model_name='room',
+            constraint=models.UniqueConstraint(fields=('hotel', 'room_number'), name='unique_room_number_per_hotel'),
+        ),
+    ]
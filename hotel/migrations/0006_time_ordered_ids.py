@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:52
+
+from django.db import migrations, models
+import hotel.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0005_property_scoped_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='id',
+            field=models.UUIDField(default=hotel.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='guest',
+            name='id',
+            field=models.UUIDField(default=hotel.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='property',
+            name='id',
+            field=models.UUIDField(default=hotel.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='id',
+            field=models.UUIDField(default=hotel.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='roomtype',
+            name='id',
+            field=models.UUIDField(default=hotel.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0006_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='external_reference',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('external_reference', ''), _negated=True), fields=('hotel', 'external_reference'), name='unique_booking_reference_per_hotel'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0007_booking_external_reference'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='changelogentry',
+            name='changelog_hotel_cursor_idx',
+        ),
+        migrations.AddField(
+            model_name='changelogentry',
+            name='transaction_id',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['hotel', 'transaction_id', 'id'], name='changelog_hotel_cursor_idx'),
+        ),
+    ]
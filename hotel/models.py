@@ -1,10 +1,34 @@
 from django.db import models
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
-import uuid
+from .ids import uuid7
+
+OTHER_PROPERTY_ERROR = "Must belong to the same property."
+
+
+class Property(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    code = models.SlugField(max_length=50, unique=True)
+    name = models.CharField(max_length=100)
+    # Alias in settings.DATABASES holding this property's rooms, guests and bookings
+    database = models.CharField(max_length=100, default='default')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = "Properties"
 
 
 class RoomType(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    hotel = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='room_types',
+        db_index=False, db_constraint=False
+    )
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     base_price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -19,6 +43,9 @@ class RoomType(models.Model):
     class Meta:
         verbose_name = "Room Type"
         verbose_name_plural = "Room Types"
+        indexes = [
+            models.Index(fields=['hotel', 'name'], name='roomtype_hotel_name_idx'),
+        ]
 
 
 class Room(models.Model):
@@ -29,8 +56,12 @@ class Room(models.Model):
         ('out_of_order', 'Out of Order'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    room_number = models.CharField(max_length=20, unique=True)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    hotel = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='rooms',
+        db_index=False, db_constraint=False
+    )
+    room_number = models.CharField(max_length=20)
     room_type = models.ForeignKey(RoomType, on_delete=models.CASCADE, related_name='rooms')
     floor_number = models.PositiveIntegerField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
@@ -40,28 +71,43 @@ class Room(models.Model):
     def __str__(self):
         return f"Room {self.room_number}"
 
+    def clean(self):
+        check_same_property(self, 'room_type')
+
     def is_available(self, check_in, check_out):
         """Check if room is available for given date range"""
         if self.status != 'available':
             return False
-        
-        overlapping_bookings = Booking.objects.filter(
-            room=self,
+        return not self.overlapping_bookings(check_in, check_out).exists()
+
+    def overlapping_bookings(self, check_in, check_out):
+        """Bookings that keep this room occupied for part of the given date range"""
+        return self.bookings.filter(
+            hotel_id=self.hotel_id,
             status__in=['confirmed', 'checked_in'],
             check_in_date__lt=check_out,
             check_out_date__gt=check_in
         )
-        return not overlapping_bookings.exists()
 
     class Meta:
         ordering = ['room_number']
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'room_number'], name='unique_room_number_per_hotel'),
+        ]
+        indexes = [
+            models.Index(fields=['hotel', 'status', 'room_number'], name='room_hotel_status_idx'),
+        ]
 
 
 class Guest(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    hotel = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='guests',
+        db_index=False, db_constraint=False
+    )
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
-    email = models.EmailField(unique=True)
+    email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
     date_of_birth = models.DateField(null=True, blank=True)
@@ -78,6 +124,12 @@ class Guest(models.Model):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        constraints = [
+            models.UniqueConstraint(fields=['hotel', 'email'], name='unique_guest_email_per_hotel'),
+        ]
+        indexes = [
+            models.Index(fields=['hotel', 'last_name', 'first_name'], name='guest_hotel_name_idx'),
+        ]
 
 
 class Booking(models.Model):
@@ -89,7 +141,11 @@ class Booking(models.Model):
         ('cancelled', 'Cancelled'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    hotel = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='bookings',
+        db_index=False, db_constraint=False
+    )
     guest = models.ForeignKey(Guest, on_delete=models.CASCADE, related_name='bookings')
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='bookings')
     check_in_date = models.DateField()
@@ -99,6 +155,8 @@ class Booking(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='confirmed')
     special_requests = models.TextField(blank=True)
+    # Reservation id from the channel manager, so re-imports don't duplicate bookings
+    external_reference = models.CharField(max_length=100, blank=True, default='')
     booking_date = models.DateTimeField(auto_now_add=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -108,13 +166,28 @@ class Booking(models.Model):
             models.CheckConstraint(
                 check=models.Q(check_out_date__gt=models.F('check_in_date')),
                 name='valid_date_range'
-            )
+            ),
+            models.UniqueConstraint(
+                fields=['hotel', 'external_reference'],
+                condition=~models.Q(external_reference=''),
+                name='unique_booking_reference_per_hotel'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['hotel', 'room', 'check_in_date', 'check_out_date'],
+                name='booking_hotel_overlap_idx'
+            ),
+            models.Index(fields=['hotel', '-created_at'], name='booking_hotel_created_idx'),
         ]
         ordering = ['-created_at']
 
     def __str__(self):
         return f"Booking {self.id} - {self.guest}"
 
+    def clean(self):
+        check_same_property(self, 'room', 'guest')
+
     @property
     def nights(self):
         return (self.check_out_date - self.check_in_date).days
@@ -124,4 +197,54 @@ class Booking(models.Model):
         return self.adults + self.children
 
     def can_be_cancelled(self):
-        return self.status in ['pending', 'confirmed']
\ No newline at end of file
+        return self.status in ['pending', 'confirmed']
+
+
+class ChangeLogEntry(models.Model):
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+
+    # Sequential, to order entries written by the same transaction
+    id = models.BigAutoField(primary_key=True)
+    hotel = models.ForeignKey(
+        Property, on_delete=models.CASCADE, related_name='changes',
+        db_index=False, db_constraint=False
+    )
+    model = models.CharField(max_length=20)
+    object_id = models.UUIDField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    # Id of the writing transaction on PostgreSQL, 0 elsewhere; the feed
+    # pages by (transaction_id, id) so it never passes an uncommitted entry
+    transaction_id = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.action}"
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Change Log Entry"
+        verbose_name_plural = "Change Log Entries"
+        indexes = [
+            models.Index(fields=['hotel', 'transaction_id', 'id'], name='changelog_hotel_cursor_idx'),
+        ]
+
+
+def check_same_property(instance, *fields):
+    """Reject related rows that belong to another property than the instance"""
+    if instance.hotel_id is None:
+        return
+    errors = {}
+    for name in fields:
+        try:
+            related = getattr(instance, name)
+        except ObjectDoesNotExist:
+            # Missing or unset; left to the field's own validation
+            continue
+        if related is not None and related.hotel_id != instance.hotel_id:
+            errors[name] = OTHER_PROPERTY_ERROR
+    if errors:
+        raise ValidationError(errors)
@@ -0,0 +1,55 @@
+from django.conf import settings
+
+# Database holding the Property rows themselves
+CATALOG_DATABASE = 'default'
+
+
+class PropertyRouter:
+    """
+    Places each property's rooms, guests and bookings on the database named
+    by its Property.database, so a large property can be moved to its own
+    database. Property rows always stay in the catalog database.
+
+    Queries are routed through the instance they start from, so scoped code
+    should go through the property's related managers (hotel.rooms,
+    hotel.bookings, ...). Subclass and override database_for_property() to
+    use a different placement policy.
+    """
+
+    def database_for_property(self, hotel):
+        if hotel.database in settings.DATABASES:
+            return hotel.database
+        return CATALOG_DATABASE
+
+    def db_for_read(self, model, **hints):
+        if is_property_model(model):
+            return CATALOG_DATABASE
+
+        instance = hints.get('instance')
+        if instance is None:
+            return None
+        if is_property_model(type(instance)):
+            return self.database_for_property(instance)
+        if instance._state.db:
+            return instance._state.db
+        # Unsaved row: follow the property it was created with
+        hotel_field = getattr(type(instance), 'hotel', None)
+        if hotel_field is not None and hotel_field.is_cached(instance):
+            return self.database_for_property(instance.hotel)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Scoped rows point at their property across databases
+        if is_property_model(type(obj1)) or is_property_model(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def is_property_model(model):
+    return model._meta.label == 'hotel.Property'
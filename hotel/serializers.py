@@ -1,8 +1,14 @@
 from rest_framework import serializers
-from .models import Room, RoomType, Guest, Booking
+from .models import Property, Room, RoomType, Guest, Booking
 from datetime import date
 
 
+class PropertySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Property
+        fields = ['id', 'code', 'name']
+
+
 class RoomTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = RoomType
@@ -70,8 +76,6 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         ]
     
     def validate_check_in_date(self, value):
-        print("Validating check-in date:", value)  # Debugging line
-        print("date.today():", date.today())  # Debugging line
         if value < date.today():
             raise serializers.ValidationError("Check-in date must be in the future.")
         return value
@@ -82,8 +86,9 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Check-out date must be after check-in date.")
         
         # Check room availability
+        hotel = self.context['hotel']
         try:
-            room = Room.objects.get(id=data['room_id'])
+            room = hotel.rooms.get(id=data['room_id'])
         except Room.DoesNotExist:
             raise serializers.ValidationError("Room not found.")
         
@@ -109,7 +114,8 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         room_id = validated_data.pop('room_id')
         
         # Create or get guest
-        guest, created = Guest.objects.get_or_create(
+        hotel = self.context['hotel']
+        guest, created = hotel.guests.get_or_create(
             email=guest_data['email'],
             defaults=guest_data
         )
@@ -122,12 +128,12 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             guest.save()
         
         # Get room and calculate total
-        room = Room.objects.get(id=room_id)
+        room = hotel.rooms.select_related('room_type').get(id=room_id)
         nights = (validated_data['check_out_date'] - validated_data['check_in_date']).days
         total_amount = room.room_type.base_price * nights
         
         # Create booking
-        booking = Booking.objects.create(
+        booking = hotel.bookings.create(
             guest=guest,
             room=room,
             total_amount=total_amount,
@@ -148,4 +154,47 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 f"Cannot cancel booking with status '{booking.status}'."
             )
-        return value
\ No newline at end of file
+        return value
+
+
+class FlexibleSearchSerializer(serializers.Serializer):
+    check_in = serializers.DateField()
+    nights = serializers.IntegerField(min_value=1, max_value=30)
+    flex_days = serializers.IntegerField(min_value=0, max_value=14, default=3)
+    guests = serializers.IntegerField(min_value=1, required=False)
+
+
+
+class AllocationRequestSerializer(serializers.Serializer):
+    # Allocation work grows with party size, so larger groups go through the hotel
+    MAX_PARTY_SIZE = 100
+
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    adults = serializers.IntegerField(min_value=1)
+    children = serializers.IntegerField(min_value=0, default=0)
+
+    def validate_check_in(self, value):
+        if value < date.today():
+            raise serializers.ValidationError("Check-in date must be in the future.")
+        return value
+
+    def validate(self, data):
+        if data['check_out'] <= data['check_in']:
+            raise serializers.ValidationError("Check-out date must be after check-in date.")
+        if data['adults'] + data['children'] > self.MAX_PARTY_SIZE:
+            raise serializers.ValidationError(
+                f"Parties of more than {self.MAX_PARTY_SIZE} guests must be arranged with the hotel."
+            )
+        return data
+
+
+
+class BookingImportSerializer(serializers.Serializer):
+    # Row number of the last row handled by the previous request, from its last_row
+    start_after = serializers.IntegerField(min_value=0, default=0)
+
+
+class ChangeFeedSerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=500)
@@ -0,0 +1,55 @@
+from django.db import router, transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .changefeed import current_transaction_id
+from .models import Property, RoomType, Room, Guest, Booking, ChangeLogEntry
+
+# Models whose changes are published through the change feed and event streams
+TRACKED_MODELS = {
+    Booking: 'booking',
+    Room: 'room',
+    RoomType: 'room_type',
+    Guest: 'guest',
+}
+
+
+def log_change(instance, action, using):
+    # Written next to the row it describes, on the property's database
+    ChangeLogEntry.objects.using(using).create(
+        hotel_id=instance.hotel_id,
+        model=TRACKED_MODELS[type(instance)],
+        object_id=instance.pk,
+        action=action,
+        transaction_id=current_transaction_id(using),
+    )
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Room)
+@receiver(post_save, sender=RoomType)
+@receiver(post_save, sender=Guest)
+def record_save(sender, instance, created, using, raw=False, **kwargs):
+    if raw:
+        return
+    log_change(instance, 'created' if created else 'updated', using)
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Room)
+@receiver(post_delete, sender=RoomType)
+@receiver(post_delete, sender=Guest)
+def record_delete(sender, instance, using, **kwargs):
+    log_change(instance, 'deleted', using)
+
+
+@receiver(pre_delete, sender=Property)
+def delete_property_rows(sender, instance, using, **kwargs):
+    # The cascade only reaches rows on the catalog database; a property
+    # placed elsewhere has its rows deleted there, children first
+    database = router.db_for_write(Booking, instance=instance)
+    if database == using:
+        return
+    with transaction.atomic(using=database):
+        for manager in ['bookings', 'guests', 'rooms', 'room_types', 'changes']:
+            getattr(instance, manager).all().delete()
@@ -0,0 +1,23 @@
+"""Rows most tests start from: a property with a standard room and a guest"""
+from decimal import Decimal
+
+from hotel.models import Property
+
+
+def create_property(code='main', name='Main', database='default'):
+    return Property.objects.create(code=code, name=name, database=database)
+
+
+def create_room_type(hotel, name='Standard', base_price='100.00', max_occupancy=2):
+    return hotel.room_types.create(name=name, base_price=Decimal(base_price), max_occupancy=max_occupancy)
+
+
+def create_room(hotel, room_number='101', room_type=None):
+    """A room of room_type, or of a new standard room type"""
+    if room_type is None:
+        room_type = create_room_type(hotel)
+    return hotel.rooms.create(room_number=room_number, room_type=room_type, floor_number=1)
+
+
+def create_guest(hotel, email='ada@example.com', first_name='Ada', last_name='Lovelace'):
+    return hotel.guests.create(first_name=first_name, last_name=last_name, email=email)
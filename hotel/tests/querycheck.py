@@ -0,0 +1,100 @@
+"""
+Helpers that pin the SQL an endpoint runs, so N+1 loops and lost indexes
+fail a test instead of showing up in production latency.
+
+A query's shape is "<alias>: <VERB> <table> [+ <other tables>]", e.g.
+"annex: SELECT hotel_room + hotel_roomtype, hotel_booking". It ignores
+columns and parameters but keeps which database was hit, which tables
+were read and how many queries ran, which is what regressions change.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+"(\w+)"', re.IGNORECASE)
+# Transaction control the test case's own atomic blocks add
+IGNORED_VERBS = {'SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN', 'COMMIT'}
+
+
+def query_shape(sql):
+    verb = sql.split(None, 1)[0].upper()
+    tables = list(dict.fromkeys(TABLE_PATTERN.findall(sql)))
+    if not tables:
+        return verb
+    shape = f'{verb} {tables[0]}'
+    if len(tables) > 1:
+        shape += ' + ' + ', '.join(tables[1:])
+    return shape
+
+
+class QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        alias = context['connection'].alias
+        if sql.split(None, 1)[0].upper() not in IGNORED_VERBS:
+            self.queries.append((alias, sql))
+        return execute(sql, params, many, context)
+
+    @property
+    def shapes(self):
+        return [f'{alias}: {query_shape(sql)}' for alias, sql in self.queries]
+
+    def describe(self):
+        return '\n'.join(f'  {alias}: {sql}' for alias, sql in self.queries)
+
+
+@contextmanager
+def capture_queries(aliases):
+    """Record the queries run on each of the given database aliases, in order"""
+    log = QueryLog()
+    wrappers = [connections[alias].execute_wrapper(log) for alias in aliases]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    try:
+        yield log
+    finally:
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+
+class QueryShapeMixin:
+    """
+    TestCase mixin. assertQueryShapes() pins the exact queries of a block,
+    assertNoSeqScan() checks a queryset's PostgreSQL plan.
+    """
+
+    @contextmanager
+    def assertQueryShapes(self, expected):
+        with capture_queries(sorted(self.databases)) as log:
+            yield log
+        self.assertEqual(
+            log.shapes, expected,
+            f"{len(log.queries)} queries ran, {len(expected)} expected:\n{log.describe()}"
+        )
+
+    def assertNoSeqScan(self, queryset, tables):
+        """
+        Fail if PostgreSQL would read any of `tables` with a sequential scan.
+
+        Test tables are tiny, so the planner would pick sequential scans on
+        cost alone. With enable_seqscan off it still does when no index fits
+        the query, which is exactly the regression this catches.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            self.skipTest("Query plans are only checked on PostgreSQL")
+
+        with transaction.atomic(using=queryset.db):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+
+        for table in tables:
+            self.assertNotRegex(
+                plan, rf'Seq Scan on {table}\b',
+                f"{table} is read with a sequential scan:\n{plan}"
+            )
+        return plan
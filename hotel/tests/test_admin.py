@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from hotel.models import Room
+from hotel.tests.fixtures import create_property, create_room, create_room_type
+
+
+class PropertyScopedAdminTests(TestCase):
+    databases = {'default', 'annex'}
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.riverside = create_property('riverside', 'Riverside')
+        self.beach = create_property('beach', 'Beach Resort', database='annex')
+        self.riverside_type = create_room_type(self.riverside, 'Riverside Standard')
+        self.beach_type = create_room_type(self.beach, 'Beach Standard')
+        self.beach_room = create_room(self.beach, 'B101', self.beach_type)
+
+    def test_list_reads_from_the_filtered_property_database(self):
+        response = self.client.get('/admin/hotel/room/', {'hotel__id__exact': str(self.beach.id)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'B101')
+
+    def test_change_form_offers_only_the_room_types_of_the_property(self):
+        response = self.client.get(f'/admin/hotel/room/{self.beach_room.id}/change/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Beach Standard')
+        self.assertNotContains(response, 'Riverside Standard')
+
+    def test_change_is_saved_on_the_property_database(self):
+        response = self.client.post(f'/admin/hotel/room/{self.beach_room.id}/change/', {
+            'hotel': str(self.beach.id),
+            'room_number': 'B101',
+            'room_type': str(self.beach_type.id),
+            'floor_number': 2,
+            'status': 'maintenance',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Room.objects.using('annex').get().status, 'maintenance')
+        self.assertFalse(Room.objects.using('default').exists())
+
+    def test_add_form_opened_from_a_filtered_list(self):
+        url = f'/admin/hotel/room/add/?_changelist_filters=hotel__id__exact%3D{self.beach.id}'
+        self.assertContains(self.client.get(url), 'Beach Standard')
+
+        response = self.client.post(url, {
+            'hotel': str(self.beach.id),
+            'room_number': 'B102',
+            'room_type': str(self.beach_type.id),
+            'floor_number': 1,
+            'status': 'available',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.beach.rooms.count(), 2)
+
+    def test_room_type_of_another_property_is_rejected(self):
+        response = self.client.post('/admin/hotel/room/add/', {
+            'hotel': str(self.beach.id),
+            'room_number': 'B102',
+            'room_type': str(self.riverside_type.id),
+            'floor_number': 1,
+            'status': 'available',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Must belong to the same property')
+        self.assertEqual(self.beach.rooms.count(), 1)
+
+    def test_delete_removes_the_row_from_the_property_database(self):
+        response = self.client.post(f'/admin/hotel/room/{self.beach_room.id}/delete/', {'post': 'yes'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Room.objects.using('annex').exists())
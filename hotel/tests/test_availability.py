@@ -0,0 +1,207 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import TestCase as SimpleTestCase, mock
+
+from rest_framework.test import APITestCase
+
+from hotel.availability import cheapest_allocation, free_gaps, flexible_windows
+from hotel.tests.fixtures import create_guest, create_property, create_room
+
+START = date(2030, 1, 1)
+
+
+def day(offset):
+    return START + timedelta(days=offset)
+
+
+class FreeGapsTests(SimpleTestCase):
+    def gaps(self, intervals, start=0, end=10):
+        return list(free_gaps([(day(a), day(b)) for a, b in intervals], day(start), day(end)))
+
+    def test_no_bookings_leave_the_whole_window(self):
+        self.assertEqual(self.gaps([]), [(day(0), day(10))])
+
+    def test_adjacent_bookings_leave_no_gap_between_them(self):
+        self.assertEqual(self.gaps([(2, 4), (4, 6)]), [(day(0), day(2)), (day(6), day(10))])
+
+    def test_booking_starting_before_the_window(self):
+        self.assertEqual(self.gaps([(-5, 3)]), [(day(3), day(10))])
+
+    def test_booking_ending_after_the_window(self):
+        self.assertEqual(self.gaps([(7, 20)]), [(day(0), day(7))])
+
+    def test_overlapping_bookings(self):
+        # (2, 3) lies inside (1, 8) and must not reopen the room at day 3
+        self.assertEqual(self.gaps([(1, 8), (2, 3), (5, 9)]), [(day(0), day(1)), (day(9), day(10))])
+
+    def test_fully_booked(self):
+        self.assertEqual(self.gaps([(-1, 4), (4, 12)]), [])
+
+
+class FlexibleWindowsTests(APITestCase):
+    def setUp(self):
+        self.hotel = create_property()
+        self.room = create_room(self.hotel)
+        self.guest = create_guest(self.hotel)
+
+    def book(self, check_in, check_out, status='confirmed'):
+        self.hotel.bookings.create(
+            room=self.room, guest=self.guest, check_in_date=check_in, check_out_date=check_out,
+            adults=1, total_amount=Decimal('100.00'), status=status,
+        )
+
+    def windows(self, earliest, latest, nights):
+        rooms = self.hotel.rooms.select_related('room_type')
+        return {
+            room_type.name: sorted(starts)
+            for room_type, starts in flexible_windows(self.hotel, rooms, day(earliest), day(latest), nights)
+        }
+
+    def test_stays_fit_between_bookings(self):
+        self.book(day(2), day(4))
+        self.book(day(4), day(6))
+        # A 2-night stay can start on day 0, or on days 6 to 8
+        self.assertEqual(self.windows(0, 8, 2), {'Standard': [day(0), day(6), day(7), day(8)]})
+
+    def test_overlapping_stored_bookings(self):
+        self.book(day(1), day(10))
+        self.book(day(2), day(3))
+        self.assertEqual(self.windows(0, 12, 1), {'Standard': [day(0), day(10), day(11), day(12)]})
+
+    def test_cancelled_bookings_do_not_block(self):
+        self.book(day(0), day(5), status='cancelled')
+        self.assertEqual(self.windows(0, 1, 2), {'Standard': [day(0), day(1)]})
+
+    def test_fully_booked_room_offers_nothing(self):
+        self.book(day(-3), day(20))
+        self.assertEqual(self.windows(0, 10, 1), {})
+
+
+class FlexibleSearchViewTests(APITestCase):
+    def setUp(self):
+        create_room(create_property())
+
+    def search(self, check_in, nights=2, flex_days=3):
+        response = self.client.get('/api/properties/main/rooms/flexible', {
+            'check_in': check_in.isoformat(), 'nights': nights, 'flex_days': flex_days,
+        })
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def test_flex_days_zero_only_offers_the_requested_date(self):
+        check_in = date.today() + timedelta(days=10)
+
+        windows = self.search(check_in, flex_days=0)[0]['windows']
+
+        self.assertEqual([window['check_in'] for window in windows], [check_in.isoformat()])
+
+    def test_windows_are_clipped_to_today(self):
+        windows = self.search(date.today() + timedelta(days=1), flex_days=3)[0]['windows']
+
+        self.assertEqual(windows[0]['check_in'], date.today().isoformat())
+        self.assertEqual(len(windows), 5)
+
+    def test_search_entirely_in_the_past_is_empty(self):
+        self.assertEqual(self.search(date.today() - timedelta(days=10), flex_days=3), [])
+
+
+class RoomTypeStub:
+    def __init__(self, name, base_price, max_occupancy):
+        self.name = name
+        self.base_price = Decimal(base_price)
+        self.max_occupancy = max_occupancy
+
+    def __repr__(self):
+        return self.name
+
+
+class CheapestAllocationTests(SimpleTestCase):
+    def allocate(self, options, guests, max_rooms):
+        allocation = cheapest_allocation(options, guests, max_rooms)
+        if allocation is None:
+            return None
+        return {room_type.name: count for room_type, count in allocation}
+
+    def test_cheapest_mix(self):
+        single = RoomTypeStub('single', '60', 1)
+        double = RoomTypeStub('double', '100', 2)
+        family = RoomTypeStub('family', '170', 4)
+
+        # 5 guests: family + single (230) beats double x2 + single (260)
+        self.assertEqual(
+            self.allocate([(single, 5), (double, 5), (family, 1)], guests=5, max_rooms=5),
+            {'single': 1, 'family': 1}
+        )
+
+    def test_equal_price_per_guest_prefers_fewer_rooms(self):
+        double = RoomTypeStub('double', '100', 2)
+        quad = RoomTypeStub('quad', '200', 4)
+
+        self.assertEqual(self.allocate([(double, 10), (quad, 1)], guests=6, max_rooms=6), {'double': 1, 'quad': 1})
+
+    def test_max_rooms_forces_larger_rooms(self):
+        single = RoomTypeStub('single', '50', 1)
+        family = RoomTypeStub('family', '300', 4)
+
+        self.assertEqual(self.allocate([(single, 4), (family, 1)], guests=4, max_rooms=4), {'single': 4})
+        self.assertEqual(self.allocate([(single, 4), (family, 1)], guests=4, max_rooms=1), {'family': 1})
+
+    def test_availability_is_respected(self):
+        double = RoomTypeStub('double', '100', 2)
+        suite = RoomTypeStub('suite', '500', 2)
+
+        self.assertEqual(self.allocate([(double, 1), (suite, 3)], guests=4, max_rooms=4), {'double': 1, 'suite': 1})
+
+    def test_infeasible_party(self):
+        double = RoomTypeStub('double', '100', 2)
+
+        self.assertIsNone(self.allocate([(double, 2)], guests=5, max_rooms=5))
+        self.assertIsNone(self.allocate([(double, 5)], guests=5, max_rooms=2))
+        self.assertIsNone(self.allocate([], guests=1, max_rooms=1))
+
+    def test_large_input_with_tied_prices_is_fast(self):
+        # Same price per guest everywhere, which defeated the old branch-and-bound pruning
+        options = [(RoomTypeStub(f'type{i}', str(100 * (i % 3 + 1)), i % 3 + 1), 50) for i in range(20)]
+
+        started = time.perf_counter()
+        allocation = cheapest_allocation(options, guests=100, max_rooms=100)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(sum(room_type.max_occupancy * count for room_type, count in allocation), 100)
+        self.assertEqual(sum(count for _, count in allocation), 34)
+        self.assertLess(elapsed, 2)
+
+
+class RoomAllocationViewTests(APITestCase):
+    def setUp(self):
+        self.hotel = create_property()
+        self.room = create_room(self.hotel)
+        self.check_in = date.today() + timedelta(days=10)
+
+    def allocate(self, check_in, adults=1, children=0):
+        return self.client.get('/api/properties/main/rooms/allocate', {
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=1)).isoformat(),
+            'adults': adults,
+            'children': children,
+        })
+
+    def test_allocation(self):
+        response = self.allocate(self.check_in)
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([room['id'] for room in response.json()['rooms']], [str(self.room.id)])
+
+    def test_oversized_party_is_rejected(self):
+        self.assertEqual(self.allocate(self.check_in, adults=80, children=30).status_code, 400)
+
+    def test_check_in_in_the_past_is_rejected(self):
+        self.assertEqual(self.allocate(date.today() - timedelta(days=1)).status_code, 400)
+
+    def test_room_booked_during_the_allocation_is_a_conflict(self):
+        # The room is counted as free, then booked before it is fetched
+        with mock.patch('hotel.views.available_rooms', return_value=self.hotel.rooms.none()):
+            response = self.allocate(self.check_in)
+
+        self.assertEqual(response.status_code, 409)
@@ -0,0 +1,151 @@
+import base64
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from hotel.changefeed import changes_since, decode_cursor, encode_cursor
+from hotel.models import ChangeLogEntry
+from hotel.ids import uuid7
+from hotel.tests.fixtures import create_guest, create_property, create_room, create_room_type
+
+
+class ChangeFeedTests(APITestCase):
+    def setUp(self):
+        self.hotel = create_property()
+        self.room_type = create_room_type(self.hotel)
+        # Start every test from an empty feed
+        self.cursor = self.feed()['cursor']
+
+    def feed(self, cursor=None, limit=None):
+        params = {}
+        if cursor:
+            params['cursor'] = cursor
+        if limit:
+            params['limit'] = limit
+        response = self.client.get('/api/properties/main/changes', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def changes(self):
+        page = self.feed(self.cursor)
+        self.cursor = page['cursor']
+        return [(change['model'], change['action']) for change in page['changes']], page
+
+    def create_room(self, number='101'):
+        return create_room(self.hotel, number, self.room_type)
+
+    def test_cursor_only_returns_newer_changes(self):
+        self.create_room('101')
+        self.assertEqual(self.changes()[0], [('room', 'created')])
+
+        self.create_room('102')
+        changes, page = self.changes()
+        self.assertEqual(changes, [('room', 'created')])
+        self.assertEqual(page['changes'][0]['data']['room_number'], '102')
+
+        self.assertEqual(self.changes()[0], [])
+
+    def test_created_then_updated_is_one_created_change_with_current_data(self):
+        room = self.create_room()
+        room.status = 'maintenance'
+        room.save()
+
+        changes, page = self.changes()
+
+        self.assertEqual(changes, [('room', 'created')])
+        self.assertEqual(page['changes'][0]['data']['status'], 'maintenance')
+
+    def test_update_then_delete_is_reported_as_deleted(self):
+        room = self.create_room()
+        self.changes()
+
+        room.status = 'maintenance'
+        room.save()
+        room_id = room.id
+        room.delete()
+        changes, page = self.changes()
+
+        self.assertEqual(changes, [('room', 'deleted')])
+        self.assertEqual(page['changes'][0]['id'], str(room_id))
+        self.assertIsNone(page['changes'][0]['data'])
+
+    def test_row_deleted_before_its_page_is_read_is_reported_as_deleted(self):
+        room = self.create_room()
+        self.create_room('102')
+        room.delete()
+
+        # The first page only reaches room 101's creation, but the room is gone
+        page = self.feed(self.cursor, limit=1)
+
+        self.assertTrue(page['has_more'])
+        self.assertEqual(page['changes'][0]['action'], 'deleted')
+
+    def test_paging_with_has_more(self):
+        for number in range(5):
+            self.create_room(str(100 + number))
+
+        page = self.feed(self.cursor, limit=3)
+        self.assertEqual((len(page['changes']), page['has_more']), (3, True))
+        page = self.feed(page['cursor'], limit=3)
+        self.assertEqual((len(page['changes']), page['has_more']), (2, False))
+
+    def test_late_committing_transaction_is_not_skipped(self):
+        # Entry 1 was written first by a transaction that committed after entry 2's
+        early, late = ChangeLogEntry.objects.bulk_create([
+            ChangeLogEntry(hotel=self.hotel, model='room', object_id=uuid7(), action='deleted', transaction_id=200),
+            ChangeLogEntry(hotel=self.hotel, model='room', object_id=uuid7(), action='deleted', transaction_id=100),
+        ])
+
+        changes, position, _ = changes_since(self.hotel, (100, late.id), limit=10)
+
+        self.assertEqual([change['id'] for change in changes], [early.object_id])
+        self.assertEqual(position, (200, early.id))
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor((123, 45))), (123, 45))
+
+    def test_cursor_without_transaction_id_is_rejected(self):
+        cursor = base64.urlsafe_b64encode(b'v1:45').decode().rstrip('=')
+
+        with self.assertRaises(ValidationError):
+            decode_cursor(cursor)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/properties/main/changes', {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bookings_carry_their_guest(self):
+        room = self.create_room()
+        guest = create_guest(self.hotel)
+        self.changes()
+
+        self.hotel.bookings.create(
+            room=room, guest=guest, check_in_date=date.today() + timedelta(days=1),
+            check_out_date=date.today() + timedelta(days=2), adults=1, total_amount=Decimal('100.00'),
+        )
+        changes, page = self.changes()
+
+        self.assertEqual(changes, [('booking', 'created')])
+        self.assertEqual(page['changes'][0]['data']['guest']['email'], 'ada@example.com')
+
+    def test_room_type_changes_are_in_the_feed(self):
+        self.room_type.base_price = Decimal('120.00')
+        self.room_type.save()
+
+        changes, page = self.changes()
+
+        self.assertEqual(changes, [('room_type', 'updated')])
+        self.assertEqual(page['changes'][0]['data']['base_price'], '120.00')
+
+    def test_lag_command_skips_databases_without_transaction_ids(self):
+        out = StringIO()
+
+        call_command('changefeed_lag', '--max-seconds', '1', stdout=out)
+
+        self.assertIn('default: writers are serialized', out.getvalue())
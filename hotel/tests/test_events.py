@@ -0,0 +1,193 @@
+import asyncio
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from hotel import events
+from hotel.events import EventHub
+from hotel.importers import BookingImporter
+from hotel.middleware import DisconnectWatcher
+from hotel.models import Property
+from hotel.tests.fixtures import create_property, create_room, create_room_type
+from hotel.views import stream_events
+
+
+class EventHubTests(TestCase):
+    def setUp(self):
+        self.hotel = create_property('riverside', 'Riverside')
+        self.room_type = create_room_type(self.hotel)
+
+    async def create_room(self, number='101', hotel=None):
+        hotel = hotel or self.hotel
+        room_type = self.room_type if hotel is self.hotel else None
+        return await sync_to_async(create_room)(hotel, number, room_type)
+
+    async def test_subscribers_receive_changes_from_the_change_log(self):
+        hub = EventHub(poll_interval=0.01)
+        subscription = await hub.subscribe(self.hotel)
+
+        room = await self.create_room()
+        event = await subscription.get(timeout=1)
+
+        self.assertEqual(event.type, 'room.status')
+        self.assertEqual(event.data, {'room_id': str(room.id), 'room_number': '101', 'status': 'available'})
+        subscription.close()
+
+    async def test_changes_written_without_signals_are_streamed(self):
+        # The importer writes bookings and their log entries in bulk, like any other process could
+        room = await self.create_room()
+        hub = EventHub(poll_interval=0.01)
+        subscription = await hub.subscribe(self.hotel)
+
+        check_in = date.today() + timedelta(days=1)
+        row = {
+            'room_number': '101', 'check_in_date': str(check_in), 'check_out_date': str(check_in + timedelta(days=2)),
+            'guest_email': 'ada@example.com',
+        }
+        await sync_to_async(lambda: BookingImporter(self.hotel).run([(1, row)]))()
+        event = await subscription.get(timeout=1)
+
+        self.assertEqual(event.type, 'booking.created')
+        self.assertEqual(event.data['room_id'], str(room.id))
+        subscription.close()
+
+    async def test_events_are_scoped_to_property(self):
+        beach = await sync_to_async(create_property)('beach', 'Beach Resort')
+        hub = EventHub(poll_interval=0.01)
+        subscription = await hub.subscribe(self.hotel)
+
+        await self.create_room(hotel=beach)
+
+        self.assertIsNone(await subscription.get(timeout=0.05))
+        subscription.close()
+
+    async def test_resume_on_another_process_replays_changes_after_last_event_id(self):
+        subscription = await EventHub(poll_interval=0.01).subscribe(self.hotel)
+        for number in ['101', '102', '103']:
+            await self.create_room(number)
+        first = await subscription.get(timeout=1)
+        subscription.close()
+
+        resumed = await EventHub(poll_interval=0.01).subscribe(self.hotel, first.id)
+
+        self.assertFalse(resumed.reset)
+        replayed = [(await resumed.get(timeout=1)).data['room_number'] for _ in range(2)]
+        self.assertEqual(replayed, ['102', '103'])
+        self.assertIsNone(await resumed.get(timeout=0.05))
+        resumed.close()
+
+    async def test_resume_after_too_many_changes_asks_client_to_reset(self):
+        subscription = await EventHub(poll_interval=0.01).subscribe(self.hotel)
+        for number in ['101', '102', '103', '104']:
+            await self.create_room(number)
+        first = await subscription.get(timeout=1)
+        subscription.close()
+
+        resumed = await EventHub(max_pending=2).subscribe(self.hotel, first.id)
+
+        self.assertTrue(resumed.reset)
+        resumed.close()
+
+    async def test_unknown_last_event_id_asks_client_to_reset(self):
+        subscription = await EventHub().subscribe(self.hotel, 'deadbeef-12')
+
+        self.assertTrue(subscription.reset)
+        subscription.close()
+
+    async def test_slow_subscriber_is_dropped(self):
+        hub = EventHub(poll_interval=0.01, max_pending=2)
+        subscription = await hub.subscribe(self.hotel)
+
+        for number in ['101', '102', '103']:
+            await self.create_room(number)
+        for _ in range(100):
+            if subscription.overflowed:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(hub.subscriber_count(self.hotel.id), 0)
+
+    def test_event_encoding(self):
+        event = events.Event('abc-1', 'room.status', {'room_number': '101'})
+
+        self.assertEqual(event.encode(), 'id: abc-1\nevent: room.status\ndata: {"room_number": "101"}\n\n')
+
+
+class EventStreamTests(TestCase):
+    @override_settings(EVENT_HUB_POLL_SECONDS=0.01)
+    async def test_stream_delivers_changes(self):
+        hotel = await Property.objects.acreate(code='riverside', name='Riverside')
+
+        response = await self.async_client.get('/api/properties/riverside/events')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        room = await sync_to_async(create_room)(hotel)
+        room.status = 'occupied'
+        await room.asave()
+        chunk = await anext(stream)
+        self.assertIn(b'event: room.status', chunk)
+        self.assertIn(b'"status": "occupied"', chunk)
+        await stream.aclose()
+
+    async def test_unknown_property_is_not_found(self):
+        response = await self.async_client.get('/api/properties/mountain/events')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_wsgi_request_is_refused(self):
+        Property.objects.create(code='riverside', name='Riverside')
+
+        response = self.client.get('/api/properties/riverside/events')
+
+        self.assertEqual(response.status_code, 501)
+        self.assertIn('ASGI', response.json()['detail'])
+
+    @override_settings(EVENT_STREAM_MAX_SECONDS=0)
+    async def test_stream_ends_after_its_maximum_lifetime(self):
+        await Property.objects.acreate(code='riverside', name='Riverside')
+
+        response = await self.async_client.get('/api/properties/riverside/events')
+
+        self.assertEqual([chunk async for chunk in response.streaming_content], [b'retry: 3000\n\n'])
+
+    @override_settings(EVENT_STREAM_HEARTBEAT_SECONDS=0.01)
+    async def test_stream_ends_at_the_heartbeat_after_a_disconnect(self):
+        hotel = await Property.objects.acreate(code='riverside', name='Riverside')
+        disconnected = asyncio.Event()
+        stream = stream_events(hotel, None, disconnected)
+
+        self.assertEqual(await anext(stream), 'retry: 3000\n\n')
+        self.assertEqual(await anext(stream), ': keepalive\n\n')
+        disconnected.set()
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(events.get_hub().subscriber_count(hotel.id), 0)
+
+
+class DisconnectWatcherTests(SimpleTestCase):
+    def test_disconnect_after_the_body_is_flagged(self):
+        messages = asyncio.Queue()
+        messages.put_nowait({'type': 'http.request', 'body': b'', 'more_body': False})
+
+        async def application(scope, receive, send):
+            # Reads the body once, like Django, then streams until told to stop
+            await receive()
+            await messages.put({'type': 'http.disconnect'})
+            await asyncio.wait_for(scope['disconnected'].wait(), 1)
+
+        asyncio.run(DisconnectWatcher(application)({'type': 'http'}, messages.get, None))
+
+    def test_other_scopes_are_passed_through(self):
+        scopes = []
+
+        async def application(scope, receive, send):
+            scopes.append(scope)
+
+        asyncio.run(DisconnectWatcher(application)({'type': 'lifespan'}, None, None))
+
+        self.assertEqual(scopes, [{'type': 'lifespan'}])
@@ -0,0 +1,28 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from hotel.ids import uuid7
+
+
+class UUID7Tests(SimpleTestCase):
+    def test_version_and_variant(self):
+        value = uuid7()
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, 'specified in RFC 4122')
+
+    def test_embeds_unix_time_in_milliseconds(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        self.assertTrue(before <= value.int >> 80 <= after + 1)
+
+    def test_ids_are_strictly_increasing_within_a_millisecond(self):
+        with mock.patch('hotel.ids.time.time_ns', return_value=1_700_000_000_000_000_000):
+            values = [uuid7() for _ in range(5000)]
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
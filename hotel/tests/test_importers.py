@@ -0,0 +1,229 @@
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from hotel.importers import BookingImporter, read_csv, read_ndjson
+from hotel.models import Guest, Booking, ChangeLogEntry
+from hotel.tests.fixtures import create_guest, create_property, create_room
+
+HEADER = 'external_reference,room_number,check_in_date,check_out_date,adults,status,guest_email,guest_first_name,guest_last_name\n'
+
+
+class BookingImporterTests(APITestCase):
+    databases = {'default', 'annex'}
+
+    def setUp(self):
+        self.beach = create_property('beach', 'Beach Resort', database='annex')
+        self.room = create_room(self.beach)
+        self.check_in = date.today() + timedelta(days=10)
+
+    def row(self, reference, nights_from=0, nights=2, room='101', email='ada@example.com', status='confirmed'):
+        check_in = self.check_in + timedelta(days=nights_from)
+        check_out = check_in + timedelta(days=nights)
+        return f'{reference},{room},{check_in},{check_out},1,{status},{email},Ada,Lovelace\n'
+
+    def run_ndjson(self, **fields):
+        row = {
+            'room_number': '101',
+            'check_in_date': str(self.check_in),
+            'check_out_date': str(self.check_in + timedelta(days=1)),
+            'guest_email': 'ada@example.com',
+            **fields,
+        }
+        return BookingImporter(self.beach).run(read_ndjson(io.StringIO(json.dumps(row))))
+
+    def run_import(self, *rows, batch_size=1000):
+        stream = io.StringIO(HEADER + ''.join(rows))
+        return BookingImporter(self.beach, batch_size=batch_size).run(read_csv(stream))
+
+    def test_rows_are_imported_on_property_database(self):
+        result = self.run_import(self.row('OTA-1'), self.row('OTA-2', nights_from=2, email='bob@example.com'))
+
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(Booking.objects.using('annex').count(), 2)
+        self.assertEqual(Guest.objects.using('annex').count(), 2)
+        self.assertFalse(Booking.objects.using('default').exists())
+
+        booking = Booking.objects.using('annex').get(external_reference='OTA-1')
+        self.assertEqual(booking.total_amount, Decimal('200.00'))
+        self.assertEqual(
+            ChangeLogEntry.objects.using('annex').filter(model='booking', action='created').count(), 2
+        )
+
+    def test_invalid_rows_are_rejected_with_reason(self):
+        result = self.run_import(
+            self.row('OTA-1', room='999'),
+            self.row('OTA-2', nights=0),
+            self.row('OTA-3', email='not-an-email'),
+            self.row('OTA-4', status='lost'),
+            self.row('OTA-5'),
+        )
+
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([rejection['row'] for rejection in result.rejected], [1, 2, 3, 4])
+        self.assertIn('Unknown room', result.rejected[0]['reason'])
+
+    def test_overlapping_rows_are_rejected(self):
+        self.run_import(self.row('OTA-1'))
+
+        result = self.run_import(
+            self.row('OTA-2', nights_from=1),
+            self.row('OTA-3', nights_from=2),
+            self.row('OTA-4', nights_from=3),
+            self.row('OTA-5', nights_from=3, status='cancelled'),
+        )
+
+        # OTA-2 overlaps the stored booking, OTA-4 the earlier row OTA-3
+        self.assertEqual(result.imported, 2)
+        self.assertEqual([rejection['row'] for rejection in result.rejected], [1, 3])
+
+    def test_stay_inside_an_earlier_long_stored_booking_is_rejected(self):
+        # Stored bookings that overlap each other, e.g. from before the overlap checks
+        guest = create_guest(self.beach)
+        for nights_from, nights in [(1, 9), (2, 1)]:
+            self.beach.bookings.create(
+                room=self.room, guest=guest, check_in_date=self.check_in + timedelta(days=nights_from),
+                check_out_date=self.check_in + timedelta(days=nights_from + nights), total_amount=Decimal('100.00'),
+            )
+
+        result = self.run_import(self.row('OTA-1', nights_from=5, nights=1))
+
+        self.assertEqual(result.imported, 0)
+        self.assertEqual(result.rejected[0]['reason'], "Room is not available for selected dates.")
+
+    def test_overlong_text_is_rejected(self):
+        for column, value in [
+            ('guest_first_name', 'A' * 101),
+            ('guest_last_name', 'L' * 101),
+            ('guest_phone', '1' * 21),
+            ('guest_email', 'ada@' + '.'.join(['x' * 60] * 5) + '.com'),
+            ('external_reference', 'R' * 101),
+        ]:
+            with self.subTest(column=column):
+                result = self.run_ndjson(**{column: value})
+
+                self.assertEqual(result.imported, 0)
+                self.assertIn(f'{column} is longer than', result.rejected[0]['reason'])
+        self.assertFalse(Booking.objects.using('annex').exists())
+
+    def test_amounts_the_column_cannot_store_are_rejected(self):
+        for amount in ['NaN', 'Infinity', '-1.00', '123456789.00', '10.005']:
+            with self.subTest(amount=amount):
+                result = self.run_ndjson(total_amount=amount)
+
+                self.assertEqual(result.imported, 0)
+                self.assertIn('Invalid total_amount', result.rejected[0]['reason'])
+
+        self.assertEqual(self.run_ndjson(total_amount='99999999.99').imported, 1)
+
+    def test_guest_count_out_of_column_range_is_rejected(self):
+        # On SQLite too, where the column itself has no limit
+        for adults in ['2147483648', '99999999999999999999']:
+            with self.subTest(adults=adults):
+                result = self.run_ndjson(adults=adults)
+
+                self.assertEqual(result.imported, 0)
+                self.assertIn('Invalid adults', result.rejected[0]['reason'])
+
+    def test_reference_stored_by_a_concurrent_import_is_skipped(self):
+        # Cancelled, so only the reference and not the stay conflicts
+        self.run_import(self.row('OTA-1', status='cancelled'))
+        checks = []
+        check_references = BookingImporter.drop_known_references
+
+        def racing_check(importer, cleaned, result):
+            # The first check runs before the other import commits OTA-1
+            checks.append(cleaned)
+            return cleaned if len(checks) == 1 else check_references(importer, cleaned, result)
+
+        with mock.patch.object(BookingImporter, 'drop_known_references', racing_check):
+            result = self.run_import(self.row('OTA-1'), self.row('OTA-2', nights_from=4))
+
+        self.assertEqual(len(checks), 2)
+        self.assertEqual((result.imported, result.skipped, result.rejected), (1, 1, []))
+        self.assertEqual(Booking.objects.using('annex').count(), 2)
+
+    def test_rerun_skips_imported_references(self):
+        rows = [self.row('OTA-1'), self.row('OTA-2', nights_from=2)]
+        self.run_import(*rows, batch_size=1)
+
+        result = self.run_import(*rows, self.row('OTA-3', nights_from=4))
+
+        self.assertEqual((result.imported, result.skipped), (1, 2))
+        self.assertEqual(Booking.objects.using('annex').count(), 3)
+
+    def test_guest_details_are_updated_by_email(self):
+        create_guest(self.beach, last_name='Byron')
+
+        self.run_import(self.row('OTA-1'))
+
+        guest = Guest.objects.using('annex').get()
+        self.assertEqual(guest.last_name, 'Lovelace')
+        self.assertEqual(guest.bookings.get().external_reference, 'OTA-1')
+
+    def test_ndjson_reports_unparseable_lines(self):
+        stream = io.StringIO(
+            '{"room_number": "101", "check_in_date": "%s", "check_out_date": "%s", '
+            '"guest_email": "ada@example.com"}\n\nnot json\n[1]\n'
+            % (self.check_in, self.check_in + timedelta(days=1))
+        )
+
+        result = BookingImporter(self.beach).run(read_ndjson(stream))
+
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([rejection['row'] for rejection in result.rejected], [2, 3])
+
+    def test_upload_endpoint(self):
+        upload = SimpleUploadedFile('reservations.csv', (HEADER + self.row('OTA-1')).encode())
+
+        response = self.client.post('/api/properties/beach/bookings/import', {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['imported'], 1)
+        self.assertEqual(Booking.objects.using('annex').get().external_reference, 'OTA-1')
+
+    def test_upload_with_byte_order_mark(self):
+        upload = SimpleUploadedFile('reservations.csv', (HEADER + self.row('OTA-1')).encode('utf-8-sig'))
+
+        response = self.client.post('/api/properties/beach/bookings/import', {'file': upload})
+
+        self.assertEqual(response.json()['imported'], 1)
+
+    def test_upload_that_is_not_utf8(self):
+        upload = SimpleUploadedFile('reservations.csv', (HEADER + self.row('OTA-1')).encode() + b'\xff\xfe\n')
+
+        response = self.client.post('/api/properties/beach/bookings/import', {'file': upload})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('not valid UTF-8', response.json()['error'])
+
+    @override_settings(BOOKING_IMPORT_MAX_ROWS=2)
+    def test_upload_is_imported_over_several_requests(self):
+        content = (HEADER + ''.join(self.row(f'OTA-{i}', nights_from=i * 2) for i in range(5))).encode()
+
+        responses = []
+        start_after = 0
+        while not responses or responses[-1]['has_more']:
+            upload = SimpleUploadedFile('reservations.csv', content)
+            response = self.client.post(
+                '/api/properties/beach/bookings/import', {'file': upload, 'start_after': start_after}
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            responses.append(response.json())
+            start_after = responses[-1]['last_row']
+
+        self.assertEqual([response['imported'] for response in responses], [2, 2, 1])
+        self.assertEqual(Booking.objects.using('annex').count(), 5)
+
+    def test_negative_start_after_is_rejected(self):
+        upload = SimpleUploadedFile('reservations.csv', (HEADER + self.row('OTA-1')).encode())
+
+        response = self.client.post('/api/properties/beach/bookings/import', {'file': upload, 'start_after': -1})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,36 @@
+import gzip
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from hotel.middleware import CompressionMiddleware
+
+
+@override_settings(RESPONSE_COMPRESSION=True, RESPONSE_COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"rooms": [' + b'{"room_number": "101", "status": "available"},' * 50 + b'{}]}'
+
+    def respond(self, content_type, body=None):
+        middleware = CompressionMiddleware(lambda request: HttpResponse(body or self.body, content_type=content_type))
+        return middleware(RequestFactory().get('/api/main/rooms', HTTP_ACCEPT_ENCODING='gzip'))
+
+    def test_json_is_gzipped_with_random_padding(self):
+        lengths = set()
+        for _ in range(10):
+            response = self.respond('application/json')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.content), self.body)
+            lengths.add(len(response.content))
+
+        # The random-length filename keeps the size from tracking the content
+        self.assertGreater(len(lengths), 1)
+
+    def test_html_is_not_compressed(self):
+        response = self.respond('text/html; charset=utf-8', b'<input name="csrfmiddlewaretoken">' * 50)
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.respond('application/json', b'{}')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
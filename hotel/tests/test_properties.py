@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from rest_framework.test import APITestCase
+
+from hotel.models import Property, RoomType, Room, Guest, Booking, ChangeLogEntry
+from hotel.tests.fixtures import create_property, create_room
+
+
+class PropertyScopingTests(APITestCase):
+    databases = {'default', 'annex'}
+
+    def setUp(self):
+        self.riverside = create_property('riverside', 'Riverside')
+        self.beach = create_property('beach', 'Beach Resort', database='annex')
+        self.riverside_room = create_room(self.riverside)
+        self.beach_room = create_room(self.beach)
+        self.check_in = date.today() + timedelta(days=10)
+        self.check_out = self.check_in + timedelta(days=2)
+
+    def book(self, hotel, room, email='guest@example.com'):
+        return self.client.post(f'/api/properties/{hotel.code}/bookings/', {
+            'room_id': str(room.id),
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': self.check_out.isoformat(),
+            'adults': 1,
+            'guest_details': {'first_name': 'Ada', 'last_name': 'Lovelace', 'email': email},
+        }, format='json')
+
+    def test_rows_are_stored_on_the_property_database(self):
+        self.assertEqual(Room.objects.using('default').get().id, self.riverside_room.id)
+        self.assertEqual(Room.objects.using('annex').get().id, self.beach_room.id)
+
+        # The catalog stays on the default database
+        self.assertEqual(Property.objects.using('annex').count(), 0)
+
+    def test_room_list_is_scoped_to_property(self):
+        response = self.client.get('/api/properties/beach/rooms')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room['id'] for room in response.json()], [str(self.beach_room.id)])
+
+    def test_routes_without_a_property_act_on_the_main_property(self):
+        main = create_property()
+        room = create_room(main, '201')
+        self.book(main, room)
+        booking = main.bookings.get()
+
+        response = self.client.get('/api/rooms')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room['id'] for room in response.json()], [str(room.id)])
+
+        response = self.client.get('/api/bookings')
+        self.assertEqual([booking['id'] for booking in response.json()], [str(booking.id)])
+        self.assertEqual(self.client.get(f'/api/bookings/{booking.id}').status_code, 200)
+
+        # Bookings of other properties stay out of reach
+        other_id = self.book(self.beach, self.beach_room).json()['id']
+        self.assertEqual(self.client.get(f'/api/bookings/{other_id}').status_code, 404)
+
+    def test_unknown_property_is_not_found(self):
+        response = self.client.get('/api/properties/mountain/rooms')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_booking_is_created_on_property_database(self):
+        response = self.book(self.beach, self.beach_room)
+
+        self.assertEqual(response.status_code, 201)
+        booking = Booking.objects.using('annex').get()
+        self.assertEqual(booking.hotel_id, self.beach.id)
+        self.assertEqual(booking.total_amount, Decimal('200.00'))
+        self.assertFalse(Booking.objects.using('default').exists())
+
+    def test_cannot_book_room_of_another_property(self):
+        response = self.book(self.riverside, self.beach_room)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.using('default').exists())
+        self.assertFalse(Booking.objects.using('annex').exists())
+
+    def test_same_guest_email_at_two_properties(self):
+        self.assertEqual(self.book(self.riverside, self.riverside_room).status_code, 201)
+        self.assertEqual(self.book(self.beach, self.beach_room).status_code, 201)
+
+        self.assertEqual(Guest.objects.using('default').get().hotel_id, self.riverside.id)
+        self.assertEqual(Guest.objects.using('annex').get().hotel_id, self.beach.id)
+
+    def test_availability_only_considers_own_property(self):
+        self.book(self.beach, self.beach_room)
+
+        response = self.client.get('/api/properties/riverside/rooms', {
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+        })
+        self.assertEqual([room['id'] for room in response.json()], [str(self.riverside_room.id)])
+
+        response = self.client.get('/api/properties/beach/rooms', {
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+        })
+        self.assertEqual(response.json(), [])
+
+    def test_booking_detail_is_not_visible_from_another_property(self):
+        booking_id = self.book(self.beach, self.beach_room).json()['id']
+
+        self.assertEqual(self.client.get(f'/api/properties/beach/bookings/{booking_id}').status_code, 200)
+        self.assertEqual(self.client.get(f'/api/properties/riverside/bookings/{booking_id}').status_code, 404)
+
+    def test_change_feed_is_scoped_to_property(self):
+        self.book(self.beach, self.beach_room)
+
+        changes = self.client.get('/api/properties/beach/changes').json()['changes']
+        self.assertEqual(
+            {(change['model'], change['action']) for change in changes},
+            {('room_type', 'created'), ('room', 'created'), ('guest', 'created'), ('booking', 'created')}
+        )
+        changes = self.client.get('/api/properties/riverside/changes').json()['changes']
+        self.assertEqual([change['model'] for change in changes], ['room_type', 'room'])
+
+    def test_deleting_a_property_deletes_its_rows_on_its_database(self):
+        self.book(self.beach, self.beach_room)
+        self.book(self.riverside, self.riverside_room)
+
+        self.beach.delete()
+
+        for model in [RoomType, Room, Guest, Booking, ChangeLogEntry]:
+            self.assertFalse(model.objects.using('annex').exists(), model.__name__)
+        self.assertEqual(Booking.objects.using('default').count(), 1)
+
+    def test_room_type_must_belong_to_the_same_property(self):
+        # Rows on different databases can't be related at all; this guards
+        # properties sharing a database
+        lakeside = create_property('lakeside', 'Lakeside')
+        room = Room(hotel=lakeside, room_number='102', floor_number=1,
+                    room_type=self.riverside_room.room_type)
+
+        with self.assertRaises(ValidationError) as caught:
+            room.full_clean()
+        self.assertIn('room_type', caught.exception.message_dict)
+
+    def test_booking_room_and_guest_must_belong_to_the_same_property(self):
+        self.book(self.riverside, self.riverside_room)
+        lakeside = create_property('lakeside', 'Lakeside')
+        booking = Booking(
+            hotel=lakeside, room=self.riverside_room, guest=Guest.objects.using('default').get(),
+            check_in_date=self.check_in, check_out_date=self.check_out, total_amount=Decimal('200.00'),
+        )
+
+        with self.assertRaises(ValidationError) as caught:
+            booking.full_clean()
+        self.assertEqual(set(caught.exception.message_dict), {'room', 'guest'})
@@ -0,0 +1,181 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from rest_framework.test import APITestCase
+
+from hotel.availability import available_rooms
+from hotel.changefeed import feed_entries
+from hotel.models import Room, Guest, Booking, ChangeLogEntry
+from hotel.tests.fixtures import create_guest, create_property, create_room, create_room_type
+from hotel.tests.querycheck import QueryShapeMixin
+
+# Every endpoint must run the same queries at each size, so per-row lookups fail
+SIZES = (1, 10, 40)
+
+PROPERTY = 'default: SELECT hotel_property'
+
+
+class QueryBudgetTests(QueryShapeMixin, APITestCase):
+    databases = {'default', 'annex'}
+
+    def setUp(self):
+        # On the annex database, so the shapes also pin where each query is routed
+        self.beach = create_property('beach', 'Beach Resort', database='annex')
+        self.room_type = create_room_type(self.beach)
+        self.check_in = date.today() + timedelta(days=10)
+        self.check_out = self.check_in + timedelta(days=2)
+
+    def grow_to(self, size):
+        """Give the property `size` rooms, guests and bookings, plus change log entries"""
+        start = self.beach.rooms.count()
+        rooms = Room.objects.using('annex').bulk_create([
+            Room(hotel=self.beach, room_number=str(100 + i), room_type=self.room_type, floor_number=1)
+            for i in range(start, size)
+        ])
+        guests = Guest.objects.using('annex').bulk_create([
+            Guest(hotel=self.beach, first_name='Guest', last_name=str(i), email=f'guest{i}@example.com')
+            for i in range(start, size)
+        ])
+        # Every other room is booked over the searched dates, starting with the second
+        bookings = Booking.objects.using('annex').bulk_create([
+            Booking(
+                hotel=self.beach, room=room, guest=guest,
+                check_in_date=self.check_in + timedelta(days=(i + 1) % 2 * 5),
+                check_out_date=self.check_out + timedelta(days=(i + 1) % 2 * 5),
+                adults=1, total_amount=Decimal('200.00'), status='confirmed',
+            )
+            for i, (room, guest) in enumerate(zip(rooms, guests), start=start)
+        ])
+        ChangeLogEntry.objects.using('annex').bulk_create(
+            [ChangeLogEntry(hotel=self.beach, model='room', object_id=room.id, action='created') for room in rooms] +
+            [ChangeLogEntry(hotel=self.beach, model='guest', object_id=guest.id, action='created') for guest in guests] +
+            [ChangeLogEntry(hotel=self.beach, model='booking', object_id=booking.id, action='created')
+             for booking in bookings]
+        )
+
+    def assertEndpointQueries(self, url, expected):
+        for size in SIZES:
+            with self.subTest(size=size):
+                self.grow_to(size)
+                with self.assertQueryShapes(expected):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, response.content)
+
+    def test_room_list(self):
+        self.assertEndpointQueries('/api/properties/beach/rooms', [
+            PROPERTY,
+            'annex: SELECT hotel_room + hotel_roomtype',
+        ])
+
+    def test_room_list_for_dates(self):
+        self.assertEndpointQueries(
+            f'/api/properties/beach/rooms?check_in={self.check_in}&check_out={self.check_out}', [
+                PROPERTY,
+                'annex: SELECT hotel_room + hotel_roomtype, hotel_booking',
+            ]
+        )
+
+    def test_flexible_search(self):
+        self.assertEndpointQueries(
+            f'/api/properties/beach/rooms/flexible?check_in={self.check_in}&nights=2', [
+                PROPERTY,
+                'annex: SELECT hotel_booking + hotel_room',
+                'annex: SELECT hotel_room + hotel_roomtype',
+            ]
+        )
+
+    def test_room_allocation(self):
+        self.assertEndpointQueries(
+            f'/api/properties/beach/rooms/allocate?check_in={self.check_in}'
+            f'&check_out={self.check_out}&adults=1', [
+                PROPERTY,
+                'annex: SELECT hotel_room + hotel_booking',
+                'annex: SELECT hotel_roomtype',
+                # One query per room type in the allocation, never per room
+                'annex: SELECT hotel_room + hotel_roomtype, hotel_booking',
+            ]
+        )
+
+    def test_booking_list(self):
+        self.assertEndpointQueries('/api/properties/beach/bookings', [
+            PROPERTY,
+            'annex: SELECT hotel_booking + hotel_guest, hotel_room, hotel_roomtype',
+        ])
+
+    def test_booking_detail(self):
+        self.grow_to(1)
+        booking = Booking.objects.using('annex').get()
+        self.assertEndpointQueries(f'/api/properties/beach/bookings/{booking.id}', [
+            PROPERTY,
+            'annex: SELECT hotel_booking + hotel_guest, hotel_room, hotel_roomtype',
+        ])
+
+    def test_booking_create(self):
+        room = create_room(self.beach, 'A1', self.room_type)
+        create_guest(self.beach)
+        for size in SIZES:
+            with self.subTest(size=size):
+                self.grow_to(size)
+                # A new stay each time, for the returning guest
+                check_in = self.check_in + timedelta(days=size * 3)
+                with self.assertQueryShapes([
+                    PROPERTY,
+                    'annex: SELECT hotel_room',
+                    'annex: SELECT hotel_booking',
+                    'annex: SELECT hotel_guest',
+                    'annex: UPDATE hotel_guest',
+                    'annex: INSERT hotel_changelogentry',
+                    'annex: SELECT hotel_room + hotel_roomtype',
+                    'annex: INSERT hotel_booking',
+                    'annex: INSERT hotel_changelogentry',
+                ]):
+                    response = self.client.post('/api/properties/beach/bookings/', {
+                        'room_id': str(room.id),
+                        'check_in_date': check_in.isoformat(),
+                        'check_out_date': (check_in + timedelta(days=2)).isoformat(),
+                        'adults': 1,
+                        'guest_details': {'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'ada@example.com'},
+                    }, format='json')
+                self.assertEqual(response.status_code, 201, response.content)
+
+    def test_change_feed(self):
+        self.assertEndpointQueries('/api/properties/beach/changes', [
+            PROPERTY,
+            'annex: SELECT hotel_changelogentry',
+            # One query per changed model, never per change
+            'annex: SELECT hotel_roomtype',
+            'annex: SELECT hotel_room + hotel_roomtype',
+            'annex: SELECT hotel_guest',
+            'annex: SELECT hotel_booking + hotel_guest, hotel_room, hotel_roomtype',
+        ])
+
+
+class QueryPlanTests(QueryShapeMixin, APITestCase):
+    """
+    Only run on PostgreSQL (hotel_reservation.settings_test_postgres); see
+    QueryShapeMixin.assertNoSeqScan
+    """
+
+    def setUp(self):
+        self.hotel = create_property()
+        self.room = create_room(self.hotel)
+        self.check_in = date.today() + timedelta(days=10)
+
+    def test_overlap_check_uses_index(self):
+        rooms = available_rooms(self.hotel, self.check_in, self.check_in + timedelta(days=2))
+
+        self.assertNoSeqScan(rooms, ['hotel_room', 'hotel_booking'])
+
+    def test_room_overlap_lookup_uses_index(self):
+        # Behind Room.is_available, run when a booking is created
+        bookings = self.room.overlapping_bookings(self.check_in, self.check_in + timedelta(days=2))
+
+        self.assertNoSeqScan(bookings, ['hotel_booking'])
+
+    def test_booking_list_uses_index(self):
+        bookings = self.hotel.bookings.select_related('guest', 'room', 'room__room_type').order_by('-created_at')
+
+        self.assertNoSeqScan(bookings, ['hotel_booking'])
+
+    def test_change_feed_uses_index(self):
+        self.assertNoSeqScan(feed_entries(self.hotel, (0, 0)), ['hotel_changelogentry'])
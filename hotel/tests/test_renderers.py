@@ -0,0 +1,62 @@
+import time
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from hotel.management.commands import benchmark_renderers
+from hotel.renderers import FastJSONRenderer, orjson
+from hotel.serializers import BookingListSerializer
+
+
+@skipIf(orjson is None, "orjson is not installed")
+class FastJSONRendererTests(SimpleTestCase):
+    def assertSameOutput(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_json_renderer(self):
+        self.assertSameOutput({
+            'id': uuid.UUID('01890a5d-ac96-774b-bcce-b302099a8057'),
+            'total_amount': Decimal('199.90'),
+            'check_in_date': date(2030, 1, 1),
+            'booking_date': datetime(2030, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            'status': gettext_lazy('confirmed'),
+            'special_requests': 'Late arrival\u2028\u2029 ünïcode',
+            'nights': 2,
+            'rate': 0.1,
+            'amenities': ['wifi', 'tv'],
+            'phone': None,
+            'is_available': True,
+            1: 'integer key',
+        })
+
+    def test_matches_json_renderer_on_lists(self):
+        self.assertSameOutput([{'room_number': str(number), 'floor_number': number} for number in range(50)])
+
+    def test_wide_integers_fall_back(self):
+        self.assertSameOutput({'count': 2 ** 70, 'negative': -(2 ** 70)})
+
+    def test_matches_json_renderer_on_booking_lists_with_nulls(self):
+        self.assertSameOutput(self.booking_list(20))
+
+    def test_faster_than_json_renderer_on_booking_lists_with_nulls(self):
+        # Every guest's date_of_birth is null, like most real booking lists
+        data = self.booking_list(1000)
+
+        self.assertLess(self.best_time(FastJSONRenderer(), data), self.best_time(JSONRenderer(), data))
+
+    def booking_list(self, rows):
+        _, bookings = benchmark_renderers.Command().build_objects(rows)
+        return BookingListSerializer(bookings, many=True).data
+
+    def best_time(self, renderer, data):
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            renderer.render(data)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
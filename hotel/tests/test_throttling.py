@@ -0,0 +1,157 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from hotel.throttling import (
+    ClientTokenBucketThrottle, GlobalTokenBucketThrottle, LayeredThrottle, ConcurrencyLimiter,
+    check_shared_cache,
+)
+from hotel.tests.fixtures import create_property
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class ClientThrottle(ClientTokenBucketThrottle):
+    scope = 'test_client'
+    rate = '2/min'
+
+
+class GlobalThrottle(GlobalTokenBucketThrottle):
+    scope = 'test_global'
+    rate = '5/min'
+
+
+class SlowCache:
+    """Sleeps after every read, widening the window between reading and writing a bucket"""
+
+    def __getattr__(self, name):
+        return getattr(cache, name)
+
+    def get(self, *args, **kwargs):
+        value = cache.get(*args, **kwargs)
+        time.sleep(0.002)
+        return value
+
+
+class SlowGlobalThrottle(GlobalThrottle):
+    cache = SlowCache()
+
+
+class LayeredTestThrottle(LayeredThrottle):
+    throttle_classes = [ClientThrottle, GlobalThrottle]
+
+
+@override_settings(CACHES=LOCMEM)
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+
+    def allowed(self, throttle_class, ip, times):
+        request = self.factory.get('/', REMOTE_ADDR=ip)
+        request.user = None
+        return sum(throttle_class().allow_request(request, None) for _ in range(times))
+
+    def test_bucket_allows_a_burst_of_rate_requests(self):
+        self.assertEqual(self.allowed(ClientThrottle, '10.0.0.1', 5), 2)
+        self.assertEqual(self.allowed(ClientThrottle, '10.0.0.2', 5), 2)
+
+    def test_rejected_client_does_not_spend_global_tokens(self):
+        self.assertEqual(self.allowed(LayeredTestThrottle, '10.0.0.1', 50), 2)
+
+        # The global bucket still has 3 of its 5 tokens for everyone else
+        self.assertEqual(self.allowed(LayeredTestThrottle, '10.0.0.2', 2), 2)
+        self.assertEqual(self.allowed(LayeredTestThrottle, '10.0.0.3', 2), 1)
+
+    def test_layered_throttle_reports_wait_of_rejecting_bucket(self):
+        request = self.factory.get('/', REMOTE_ADDR='10.0.0.1')
+        request.user = None
+        for _ in range(2):
+            LayeredTestThrottle().allow_request(request, None)
+
+        throttle = LayeredTestThrottle()
+        self.assertFalse(throttle.allow_request(request, None))
+        self.assertIsInstance(throttle.rejected_by, ClientThrottle)
+        self.assertAlmostEqual(throttle.wait(), 30, delta=1)
+
+    def test_concurrent_requests_do_not_over_admit(self):
+        request = self.factory.get('/', REMOTE_ADDR='10.0.0.1')
+        request.user = None
+        admitted = []
+        start = threading.Barrier(20)
+
+        def hit():
+            start.wait()
+            admitted.append(SlowGlobalThrottle().allow_request(request, None))
+
+        threads = [threading.Thread(target=hit) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(admitted.count(True), 5)
+
+
+@override_settings(CACHES=LOCMEM)
+class ConcurrencyLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_and_release(self):
+        first, second, third = (ConcurrencyLimiter('search', 2) for _ in range(3))
+
+        self.assertTrue(first.acquire())
+        self.assertTrue(second.acquire())
+        self.assertFalse(third.acquire())
+
+        first.release()
+        self.assertTrue(third.acquire())
+
+    def test_lapsed_lease_never_frees_other_requests_slots(self):
+        old = [ConcurrencyLimiter('search', 2) for _ in range(2)]
+        for limiter in old:
+            self.assertTrue(limiter.acquire())
+
+        # Both leases lapse while their requests are still running
+        cache.clear()
+        new = [ConcurrencyLimiter('search', 2) for _ in range(2)]
+        for limiter in new:
+            self.assertTrue(limiter.acquire())
+
+        for limiter in old:
+            limiter.release()
+        self.assertFalse(ConcurrencyLimiter('search', 2).acquire())
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM)
+    def test_several_workers_on_a_process_local_cache_are_refused(self):
+        check_shared_cache(1)
+        with self.assertRaises(ImproperlyConfigured):
+            check_shared_cache(4)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379/0',
+    }})
+    def test_shared_cache_allows_several_workers(self):
+        check_shared_cache(4)
+
+
+@override_settings(CACHES=LOCMEM, CONCURRENCY_LIMITS={'search': 1})
+class ConcurrencyLimitViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        create_property()
+
+    def test_request_is_shed_before_the_property_lookup(self):
+        ConcurrencyLimiter('search', 1).acquire()
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/properties/main/rooms')
+
+        self.assertEqual(response.status_code, 429)
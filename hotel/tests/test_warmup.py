@@ -0,0 +1,15 @@
+from django.test import TransactionTestCase
+from django.urls import get_resolver
+
+from hotel.warmup import warm_up
+
+
+# Not wrapped in a transaction, since warm_up() closes every connection
+class WarmUpTests(TransactionTestCase):
+    databases = {'default', 'annex'}
+
+    def test_warm_up_runs_every_step(self):
+        timings = warm_up()
+
+        self.assertEqual(list(timings), ['urls', 'serializers', 'querysets', 'connections'])
+        self.assertIn('booking-list', get_resolver().reverse_dict)
@@ -0,0 +1,226 @@
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache as default_cache
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket kept in the cache framework.
+
+    A rate of "N/period" gives a bucket of N tokens that refills at N per
+    period, so clients can burst up to N requests and then continue at the
+    steady rate. Subclasses decide who shares a bucket via get_cache_key().
+    """
+
+    # The read-modify-write of a bucket runs under a short cache lock so
+    # workers sharing a bucket cannot both spend the same token
+    lock_timeout = 1
+    lock_attempts = 20
+    lock_retry_delay = 0.002
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock = CacheLock(self.cache, f'{self.key}_lock', self.lock_timeout)
+        if not lock.acquire(self.lock_attempts, self.lock_retry_delay):
+            # Too contended to tell; shed rather than over-admit
+            self.tokens = 0
+            return self.throttle_failure()
+        try:
+            self.now = self.timer()
+            tokens, updated_at = self.cache.get(self.key, (self.num_requests, self.now))
+            refill_rate = self.num_requests / self.duration
+            self.tokens = min(self.num_requests, tokens + (self.now - updated_at) * refill_rate)
+
+            if self.tokens < 1:
+                return self.throttle_failure()
+
+            self.cache.set(self.key, (self.tokens - 1, self.now), self.duration)
+            return True
+        finally:
+            lock.release()
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class ClientTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per authenticated user, or per client IP for anonymous requests"""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class GlobalTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket shared by every client"""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': 'global'}
+
+
+class LayeredThrottle(BaseThrottle):
+    """
+    Applies throttle_classes in order and stops at the first that rejects.
+    DRF itself asks every throttle of a view, so a client over its own
+    budget would keep draining a shared bucket listed after it.
+    """
+    throttle_classes = []
+
+    def allow_request(self, request, view):
+        self.rejected_by = None
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, view):
+                self.rejected_by = throttle
+                return False
+        return True
+
+    def wait(self):
+        return self.rejected_by.wait() if self.rejected_by else None
+
+
+class SearchRateThrottle(ClientTokenBucketThrottle):
+    scope = 'search'
+
+
+class GlobalSearchRateThrottle(GlobalTokenBucketThrottle):
+    scope = 'search_global'
+
+
+class SearchThrottle(LayeredThrottle):
+    """The client's own bucket first; only requests it admits spend global tokens"""
+    throttle_classes = [SearchRateThrottle, GlobalSearchRateThrottle]
+
+
+class BookingRateThrottle(ClientTokenBucketThrottle):
+    scope = 'booking'
+
+
+class CacheLock:
+    """
+    Mutual exclusion through cache.add(), which is atomic on shared cache
+    backends. The lock expires after `timeout` seconds in case its holder
+    dies, and is only deleted by the holder that set it.
+    """
+
+    def __init__(self, cache, key, timeout):
+        self.cache = cache
+        self.key = key
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self, attempts, retry_delay):
+        for _ in range(attempts):
+            if self.cache.add(self.key, self.token, self.timeout):
+                return True
+            time.sleep(retry_delay)
+        return False
+
+    def release(self):
+        if self.cache.get(self.key) == self.token:
+            self.cache.delete(self.key)
+
+
+class ConcurrencyLimiter:
+    """
+    Tracks in-flight requests for a scope as `limit` slot keys in the
+    cache, so the limit holds across worker processes. A request takes a
+    free slot with cache.add() and deletes it when done. Each slot expires
+    after `lease` seconds, which frees slots leaked by a worker that died
+    mid-request, and an expired slot only ever frees itself, so the count
+    can never drift below zero.
+    """
+    cache = default_cache
+    lease = 60
+
+    def __init__(self, scope, limit):
+        self.scope = scope
+        self.limit = limit
+        self.slot_key = None
+        self.token = uuid.uuid4().hex
+
+    def acquire(self):
+        # Start at a random slot so concurrent requests don't all probe the same keys
+        first = random.randrange(self.limit) if self.limit > 0 else 0
+        for offset in range(self.limit):
+            key = f'concurrency_{self.scope}_{(first + offset) % self.limit}'
+            if self.cache.add(key, self.token, self.lease):
+                self.slot_key = key
+                return True
+        return False
+
+    def release(self):
+        if self.slot_key is None:
+            return
+        # After a lapsed lease the slot may belong to another request by now
+        if self.cache.get(self.slot_key) == self.token:
+            self.cache.delete(self.slot_key)
+        self.slot_key = None
+
+
+class ConcurrencyLimitMixin:
+    """
+    Sheds requests with 429 and Retry-After once CONCURRENCY_LIMITS[scope]
+    requests of the same scope are already running. The check runs after
+    authentication and throttling, before the handler touches the database.
+    List it after PropertyScopedMixin, whose initial() runs its property
+    lookup once this one has returned.
+    """
+    concurrency_scope = None
+    concurrency_retry_after = 1
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        limit = getattr(settings, 'CONCURRENCY_LIMITS', {}).get(self.concurrency_scope)
+        if limit is None:
+            return
+
+        limiter = ConcurrencyLimiter(self.concurrency_scope, limit)
+        if not limiter.acquire():
+            raise Throttled(wait=self.concurrency_retry_after)
+        self.concurrency_limiter = limiter
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        limiter = getattr(self, 'concurrency_limiter', None)
+        if limiter is not None:
+            limiter.release()
+            self.concurrency_limiter = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+# Caches whose contents are private to one process
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+def check_shared_cache(processes):
+    """
+    Throttle buckets and concurrency slots are counted in the default
+    cache. With a per-process cache every worker keeps its own counters,
+    multiplying each limit by the number of workers, so refuse to run
+    several processes on one.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if processes > 1 and backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"{processes} worker processes cannot share throttle and concurrency counters in "
+            f"{backend}; set CACHE_BACKEND to a shared cache such as "
+            "django.core.cache.backends.redis.RedisCache"
+        )
@@ -1,13 +1,38 @@
-from django.urls import path
+from django.urls import include, path
 from .views import (
-    RoomListView, BookingCreateView,
-    BookingDetailView, BookingUpdateView,BookingListView
+    PropertyListView,
+    RoomListView, FlexibleRoomSearchView, RoomAllocationView, BookingCreateView,
+    BookingDetailView, BookingUpdateView,BookingListView,
+    BookingImportView, ChangeFeedView, event_stream
 )
 
-urlpatterns = [
+property_patterns = [
     path('rooms', RoomListView.as_view(), name='room-list'),
+    path('rooms/flexible', FlexibleRoomSearchView.as_view(), name='room-flexible-search'),
+    path('rooms/allocate', RoomAllocationView.as_view(), name='room-allocate'),
     path('bookings', BookingListView.as_view(), name='booking-list'),
     path('bookings/', BookingCreateView.as_view(), name='booking-create'),
+    path('bookings/import', BookingImportView.as_view(), name='booking-import'),
     path('bookings/<uuid:id>', BookingDetailView.as_view(), name='booking-detail'),
     path('bookings/<uuid:id>/update', BookingUpdateView.as_view(), name='booking-update'),
+    path('changes', ChangeFeedView.as_view(), name='change-feed'),
+    path('events', event_stream, name='event-stream'),
+]
+
+# Routes from before multi-property support, kept for existing clients.
+# They act on the property migration 0004 moved the original rows into.
+LEGACY_PROPERTY_CODE = 'main'
+legacy = {'property_code': LEGACY_PROPERTY_CODE}
+
+legacy_patterns = [
+    path('rooms', RoomListView.as_view(), legacy, name='legacy-room-list'),
+    path('bookings', BookingListView.as_view(), legacy, name='legacy-booking-list'),
+    path('bookings/', BookingCreateView.as_view(), legacy, name='legacy-booking-create'),
+    path('bookings/<uuid:id>', BookingDetailView.as_view(), legacy, name='legacy-booking-detail'),
+    path('bookings/<uuid:id>/update', BookingUpdateView.as_view(), legacy, name='legacy-booking-update'),
 ]
+
+urlpatterns = [
+    path('properties', PropertyListView.as_view(), name='property-list'),
+    path('properties/<slug:property_code>/', include(property_patterns)),
+] + legacy_patterns
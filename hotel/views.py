@@ -1,19 +1,60 @@
+import asyncio
+import io
+
 from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
+from django.conf import settings
 from django.db.models import Q
-from datetime import datetime, date
-from .models import Room, Booking
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from datetime import datetime, date, timedelta
+from .models import Property
+from .throttling import (
+    ConcurrencyLimitMixin, SearchThrottle, BookingRateThrottle
+)
+from .changefeed import changes_since, encode_cursor, decode_cursor
+from .events import get_hub
+from .importers import READERS, BookingImporter
+from .availability import (
+    flexible_windows, available_rooms, availability_by_type, cheapest_allocation
+)
 from .serializers import (
-    RoomSerializer, BookingSerializer, 
-    BookingCreateSerializer,BookingListSerializer
+    PropertySerializer, RoomSerializer, BookingSerializer, 
+    BookingCreateSerializer,BookingListSerializer,
+    RoomTypeSerializer, FlexibleSearchSerializer, AllocationRequestSerializer,
+    BookingImportSerializer, ChangeFeedSerializer
 )
 
-class RoomListView(generics.ListAPIView):
+class PropertyScopedMixin:
+    """
+    Scopes a view to the property whose code is in the URL. Querysets built
+    from self.hotel's related managers are filtered to that property and
+    routed to the database it is placed on.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.hotel = get_object_or_404(Property, code=kwargs['property_code'])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['hotel'] = getattr(self, 'hotel', None)
+        return context
+
+class PropertyListView(generics.ListAPIView):
+    queryset = Property.objects.all()
+    serializer_class = PropertySerializer
+
+class RoomListView(PropertyScopedMixin, ConcurrencyLimitMixin, generics.ListAPIView):
     serializer_class = RoomSerializer
+    throttle_classes = [SearchThrottle]
+    concurrency_scope = 'search'
     
     def get_queryset(self):
-        queryset = Room.objects.select_related('room_type').filter(status='available')
+        queryset = self.hotel.rooms.filter(status='available')
         
         # Filter by dates
         check_in = self.request.query_params.get('check_in')
@@ -24,16 +65,13 @@ class RoomListView(generics.ListAPIView):
                 check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
                 check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
                 
-                # Filter rooms that are available for the date range
-                available_rooms = []
-                for room in queryset:
-                    if room.is_available(check_in_date, check_out_date):
-                        available_rooms.append(room.id)
-                
-                queryset = queryset.filter(id__in=available_rooms)
+                # Overlapping bookings are excluded in the same query, not room by room
+                queryset = available_rooms(self.hotel, check_in_date, check_out_date)
             except ValueError:
                 pass  # Invalid date format, ignore filtering
         
+        queryset = queryset.select_related('room_type')
+        
         # Filter by price range
         min_price = self.request.query_params.get('min_price')
         max_price = self.request.query_params.get('max_price')
@@ -67,15 +105,114 @@ class RoomListView(generics.ListAPIView):
         
         return queryset.order_by('room_number')
 
-class BookingListView(generics.ListAPIView):
-    queryset = Booking.objects.select_related('guest', 'room', 'room__room_type')
+class FlexibleRoomSearchView(PropertyScopedMixin, ConcurrencyLimitMixin, generics.GenericAPIView):
+    throttle_classes = [SearchThrottle]
+    concurrency_scope = 'search'
+
+    def get(self, request, *args, **kwargs):
+        params = FlexibleSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        check_in = params.validated_data['check_in']
+        nights = params.validated_data['nights']
+        flex_days = params.validated_data['flex_days']
+
+        rooms = self.hotel.rooms.select_related('room_type').filter(status='available')
+        guests = params.validated_data.get('guests')
+        if guests:
+            rooms = rooms.filter(room_type__max_occupancy__gte=guests)
+
+        # Never offer windows that start in the past
+        earliest_start = max(check_in - timedelta(days=flex_days), date.today())
+        latest_start = check_in + timedelta(days=flex_days)
+        if latest_start < earliest_start:
+            return Response({'check_in': check_in, 'nights': nights, 'results': []})
+
+        # Cheapest room types first, earliest window breaking ties
+        available = sorted(
+            flexible_windows(self.hotel, rooms, earliest_start, latest_start, nights),
+            key=lambda item: (item[0].base_price, min(item[1]))
+        )
+
+        results = []
+        for room_type, starts in available:
+            earliest = min(starts)
+            results.append({
+                'room_type': RoomTypeSerializer(room_type).data,
+                'total_price': str(room_type.base_price * nights),
+                'earliest': {
+                    'check_in': earliest,
+                    'check_out': earliest + timedelta(days=nights),
+                    'room_id': starts[earliest][0],
+                },
+                'windows': [
+                    {
+                        'check_in': start,
+                        'check_out': start + timedelta(days=nights),
+                        'rooms_available': len(room_ids),
+                    }
+                    for start, room_ids in sorted(starts.items())
+                ],
+            })
+
+        return Response({'check_in': check_in, 'nights': nights, 'results': results})
+
+class RoomAllocationView(PropertyScopedMixin, ConcurrencyLimitMixin, generics.GenericAPIView):
+    throttle_classes = [SearchThrottle]
+    concurrency_scope = 'search'
+
+    def get(self, request, *args, **kwargs):
+        params = AllocationRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        check_in = params.validated_data['check_in']
+        check_out = params.validated_data['check_out']
+        adults = params.validated_data['adults']
+        children = params.validated_data['children']
+        guests = adults + children
+
+        # Every room needs at least one adult
+        allocation = cheapest_allocation(
+            availability_by_type(self.hotel, check_in, check_out), guests, max_rooms=adults
+        )
+        if allocation is None:
+            return Response(
+                {'error': 'No combination of available rooms fits this party'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        rooms = []
+        for room_type, count in allocation:
+            rooms.extend(
+                available_rooms(self.hotel, check_in, check_out)
+                .filter(room_type=room_type)
+                .select_related('room_type')[:count]
+            )
+        if len(rooms) < sum(count for _, count in allocation):
+            # Rooms were booked between counting and fetching them
+            return Response(
+                {'error': 'Rooms were booked while the allocation was made; try again'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        nights = (check_out - check_in).days
+        return Response({
+            'check_in': check_in,
+            'check_out': check_out,
+            'nights': nights,
+            'total_guests': guests,
+            'total_price': str(sum(room.room_type.base_price for room in rooms) * nights),
+            'rooms': RoomSerializer(rooms, many=True).data,
+        })
+
+class BookingListView(PropertyScopedMixin, generics.ListAPIView):
     serializer_class = BookingListSerializer
     def get_queryset(self):
-        queryset = Booking.objects.select_related('guest', 'room', 'room__room_type')
+        queryset = self.hotel.bookings.select_related('guest', 'room', 'room__room_type')
         return queryset.order_by('-created_at')
 
-class BookingCreateView(generics.CreateAPIView):
+class BookingCreateView(PropertyScopedMixin, generics.CreateAPIView):
     serializer_class = BookingCreateSerializer
+    # Own budget, so search traffic can never use up booking capacity
+    throttle_classes = [BookingRateThrottle]
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -86,15 +223,60 @@ class BookingCreateView(generics.CreateAPIView):
         response_serializer = BookingSerializer(booking)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
-class BookingDetailView(generics.RetrieveAPIView):
-    queryset = Booking.objects.select_related('guest', 'room', 'room__room_type')
+class BookingImportView(PropertyScopedMixin, generics.GenericAPIView):
+    parser_classes = [MultiPartParser]
+    throttle_classes = [BookingRateThrottle]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload the reservations as "file"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in READERS:
+            return Response(
+                {'error': f"Unsupported format; use one of: {', '.join(sorted(READERS))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = BookingImportSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        start_after = params.validated_data['start_after']
+
+        # Each request handles at most BOOKING_IMPORT_MAX_ROWS rows; while has_more
+        # is true, post the file again with start_after set to the returned last_row
+        committed = {'last_row': start_after}
+
+        def on_batch(result):
+            committed['last_row'] = result.last_row
+
+        # utf-8-sig drops the byte order mark spreadsheet exports start with
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            result = BookingImporter(self.hotel).run(
+                READERS[file_format](stream), start_after, on_batch=on_batch,
+                max_rows=getattr(settings, 'BOOKING_IMPORT_MAX_ROWS', 5000)
+            )
+        except UnicodeDecodeError as exc:
+            return Response(
+                {'error': f"The file is not valid UTF-8: {exc}", 'last_row': committed['last_row']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(result.as_dict())
+
+class BookingDetailView(PropertyScopedMixin, generics.RetrieveAPIView):
     serializer_class = BookingSerializer
     lookup_field = 'id'
 
-class BookingUpdateView(generics.UpdateAPIView):
-    queryset = Booking.objects.all()
+    def get_queryset(self):
+        return self.hotel.bookings.select_related('guest', 'room', 'room__room_type')
+
+class BookingUpdateView(PropertyScopedMixin, generics.UpdateAPIView):
     serializer_class = BookingSerializer
     lookup_field = 'id'
+
+    def get_queryset(self):
+        return self.hotel.bookings.all()
     
     def patch(self, request, *args, **kwargs):
         booking = self.get_object()
@@ -116,3 +298,68 @@ class BookingUpdateView(generics.UpdateAPIView):
             {'error': 'Only cancellation is allowed'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+class ChangeFeedView(PropertyScopedMixin, generics.GenericAPIView):
+    def get(self, request, *args, **kwargs):
+        params = ChangeFeedSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        cursor = params.validated_data.get('cursor')
+        after = decode_cursor(cursor) if cursor else (0, 0)
+
+        changes, last_position, has_more = changes_since(self.hotel, after, params.validated_data['limit'])
+        return Response({
+            'cursor': encode_cursor(last_position),
+            'has_more': has_more,
+            'changes': changes,
+        })
+
+async def event_stream(request, property_code):
+    """
+    Server-Sent Events stream of room status and booking changes for one
+    property. Must be served over ASGI; browsers resume automatically by
+    sending Last-Event-ID when they reconnect.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the stream would hold a worker until the process exits
+        return JsonResponse(
+            {'detail': "The event stream is only served over ASGI; route it to the ASGI process (hotel_reservation.asgi)."},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+
+    hotel = await Property.objects.filter(code=property_code).afirst()
+    if hotel is None:
+        raise Http404
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(
+        stream_events(hotel, last_event_id, request.scope.get('disconnected')),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+async def stream_events(hotel, last_event_id, disconnected=None):
+    """
+    Ends when the client disconnects (seen at the next event or heartbeat,
+    given the asyncio.Event set by DisconnectWatcher) and in any case after
+    EVENT_STREAM_MAX_SECONDS, after which the client reconnects and resumes.
+    """
+    subscription = await get_hub().subscribe(hotel, last_event_id)
+    heartbeat = getattr(settings, 'EVENT_STREAM_HEARTBEAT_SECONDS', 15)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + getattr(settings, 'EVENT_STREAM_MAX_SECONDS', 3600)
+    try:
+        yield 'retry: 3000\n\n'
+        if subscription.reset:
+            # Too many missed changes to replay; the client must reload its state
+            yield 'event: reset\ndata: {}\n\n'
+        while not subscription.overflowed:
+            event = await subscription.get(min(heartbeat, max(deadline - loop.time(), 0)))
+            if loop.time() >= deadline or (disconnected is not None and disconnected.is_set()):
+                # A reconnecting client resumes after its last delivered event
+                break
+            yield event.encode() if event is not None else ': keepalive\n\n'
+    finally:
+        subscription.close()
@@ -0,0 +1,102 @@
+"""
+Work a worker would otherwise do on its first requests, done once up front.
+
+With gunicorn's preload_app the master imports the project, runs warm_up()
+and then forks; workers inherit the populated URL resolver, model and
+serializer metadata, translation catalogs and compiled query machinery
+instead of each paying for them on their first requests. See
+gunicorn.conf.py.
+
+Database sockets must not be shared across fork, so warm_up() closes every
+connection it opened and open_connections() is run again in each worker.
+"""
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils import translation
+
+
+def warm_up(connect=True):
+    """Run every warm-up step and return how long each took, in seconds"""
+    timings = {}
+    steps = [
+        ('urls', resolve_urls),
+        ('serializers', build_serializer_fields),
+        ('querysets', compile_querysets),
+    ]
+    if connect:
+        steps.append(('connections', open_connections))
+
+    try:
+        for name, step in steps:
+            started = time.perf_counter()
+            step()
+            timings[name] = time.perf_counter() - started
+    finally:
+        connections.close_all()
+    return timings
+
+
+def resolve_urls():
+    """Compile every URL pattern and build the reverse() lookup tables"""
+    resolver = get_resolver()
+    compile_patterns(resolver)
+    resolver.reverse_dict
+
+
+def compile_patterns(resolver):
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            compile_patterns(pattern)
+
+
+def build_serializer_fields():
+    """
+    Instantiate each serializer and build its fields. This loads model
+    metadata, field validators and the translation catalogs behind
+    their error messages.
+    """
+    from rest_framework.serializers import BaseSerializer
+    from . import serializers
+
+    translation.activate(settings.LANGUAGE_CODE)
+    for serializer_class in vars(serializers).values():
+        if (isinstance(serializer_class, type) and issubclass(serializer_class, BaseSerializer)
+                and serializer_class.__module__ == serializers.__name__):
+            for field in serializer_class().fields.values():
+                field.validators
+                field.error_messages
+
+
+def compile_querysets():
+    """Compile the SQL of the hot read queries, for each configured database, without running it"""
+    from .availability import available_rooms
+    from .models import Property
+
+    check_in = date.today()
+    check_out = check_in + timedelta(days=1)
+    for alias in settings.DATABASES:
+        hotel = Property(code='warmup', database=alias)
+        querysets = [
+            available_rooms(hotel, check_in, check_out).select_related('room_type'),
+            hotel.rooms.select_related('room_type').filter(status='available'),
+            hotel.bookings.select_related('guest', 'room', 'room__room_type'),
+            hotel.bookings.filter(
+                status__in=['confirmed', 'checked_in'],
+                check_in_date__lt=check_out,
+                check_out_date__gt=check_in,
+            ).values_list('room_id', 'check_in_date', 'check_out_date'),
+            hotel.changes.filter(id__gt=0),
+        ]
+        for queryset in querysets:
+            queryset.query.get_compiler(using=alias).as_sql()
+
+
+def open_connections():
+    """Connect to every configured database, so the first request skips the handshake"""
+    for connection in connections.all():
+        connection.ensure_connection()
@@ -0,0 +1,12 @@
+import os
+from django.core.asgi import get_asgi_application
+
+from hotel.middleware import DisconnectWatcher
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hotel_reservation.settings')
+# Each ASGI request runs its queries on a thread of its own, so a connection
+# kept open after the request would never be used again
+os.environ['DB_CONN_MAX_AGE'] = '0'
+
+# DisconnectWatcher lets the event stream end when its client goes away
+application = DisconnectWatcher(get_asgi_application())
@@ -1,3 +1,4 @@
+from importlib.util import find_spec
 from pathlib import Path
 from decouple import config
 
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'hotel.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +52,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hotel_reservation.wsgi.application'
+ASGI_APPLICATION = 'hotel_reservation.asgi.application'
 
 DATABASES = {
     'default': {
@@ -59,16 +62,64 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Keep each worker's connection open across requests instead of reconnecting every time
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# A property can be moved to its own database by adding an alias above and
+# setting Property.database to it; the router sends its rows there
+DATABASE_ROUTERS = ['hotel.routers.PropertyRouter']
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'hotel.renderers.FastJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'hotel.parsers.FastJSONParser',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'search': config('THROTTLE_SEARCH_RATE', default='60/min'),
+        'search_global': config('THROTTLE_SEARCH_GLOBAL_RATE', default='1200/min'),
+        'booking': config('THROTTLE_BOOKING_RATE', default='20/min'),
+    },
+}
+
+# MessagePack is negotiated through Accept / Content-Type when msgpack is installed
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('hotel.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('hotel.parsers.MessagePackParser')
+
+# gzip/brotli compression for JSON and msgpack responses of at least
+# RESPONSE_COMPRESSION_MIN_SIZE bytes
+RESPONSE_COMPRESSION = config('RESPONSE_COMPRESSION', default=False, cast=bool)
+RESPONSE_COMPRESSION_MIN_SIZE = config('RESPONSE_COMPRESSION_MIN_SIZE', default=1024, cast=int)
+
+# Rows handled per request by /api/properties/<code>/bookings/import; larger files take several requests
+BOOKING_IMPORT_MAX_ROWS = config('BOOKING_IMPORT_MAX_ROWS', default=5000, cast=int)
+
+# Live event stream (/api/properties/<code>/events)
+# Streams tail the change log, so they see changes made by any process
+EVENT_HUB_POLL_SECONDS = config('EVENT_HUB_POLL_SECONDS', default=1, cast=float)
+EVENT_HUB_MAX_PENDING = config('EVENT_HUB_MAX_PENDING', default=1000, cast=int)
+EVENT_STREAM_HEARTBEAT_SECONDS = config('EVENT_STREAM_HEARTBEAT_SECONDS', default=15, cast=int)
+# Streams are closed after this long even if the client looks connected; it reconnects and resumes
+EVENT_STREAM_MAX_SECONDS = config('EVENT_STREAM_MAX_SECONDS', default=3600, cast=int)
+
+# Maximum in-flight requests per scope before new ones are shed with 429
+CONCURRENCY_LIMITS = {
+    'search': config('SEARCH_CONCURRENCY_LIMIT', default=16, cast=int),
+}
+
+# Throttling and concurrency counters live here. gunicorn refuses to start several
+# workers on a per-process cache (see gunicorn.conf.py); use a shared backend such
+# as django.core.cache.backends.redis.RedisCache there
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -81,5 +132,3 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-
-print("Settings loaded successfully.")
\ No newline at end of file
@@ -0,0 +1,22 @@
+from .settings import *  # noqa: F401,F403
+
+# Two SQLite databases so property placement and routing can be tested
+# without PostgreSQL. Run with:
+#   python manage.py test --settings=hotel_reservation.settings_test
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_default.sqlite3',
+    },
+    'annex': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_annex.sqlite3',
+    },
+}
+
+# Tests exercise endpoints far faster than the production throttle rates allow
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
@@ -0,0 +1,17 @@
+from decouple import config
+
+from .settings_test import *  # noqa: F401,F403
+from .settings import DATABASES as SITE_DATABASES
+
+# The test layout on PostgreSQL, so the EXPLAIN checks in
+# hotel/tests/test_query_budgets.py run instead of being skipped. Uses the
+# DB_* connection settings; Django creates and drops test_<name> for each
+# alias. Run with:
+#   python manage.py test --settings=hotel_reservation.settings_test_postgres
+DATABASES = {
+    'default': SITE_DATABASES['default'],
+    'annex': {
+        **SITE_DATABASES['default'],
+        'NAME': config('DB_ANNEX_NAME', default='hotel_reservation_annex'),
+    },
+}
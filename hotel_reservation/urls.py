@@ -23,8 +23,12 @@ def api_root(request):
         'message': 'Hotel Reservation System API',
         'version': '1.0',
         'endpoints': {
-            'rooms': '/api/rooms/',
-            'bookings': '/api/bookings/',
+            'properties': '/api/properties',
+            'rooms': '/api/properties/<code>/rooms',
+            'flexible_search': '/api/properties/<code>/rooms/flexible',
+            'allocate': '/api/properties/<code>/rooms/allocate',
+            'bookings': '/api/properties/<code>/bookings/',
+            'changes': '/api/properties/<code>/changes',
             'admin': '/admin/',
         }
     })
@@ -34,4 +38,3 @@ urlpatterns = [
     path('api/', include('hotel.urls')),
     path('', api_root, name='api-root'),
 ]
-print("URL configuration loaded successfully.")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 from django.core.wsgi import get_wsgi_application
 
-print("Setting up WSGI application...")
-application = get_wsgi_application()
\ No newline at end of file
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hotel_reservation.settings')
+
+application = get_wsgi_application()
@@ -7,15 +7,20 @@ import random
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hotel_reservation.settings')
 django.setup()
 
-from hotel.models import RoomType, Room, Guest, Booking
+from hotel.models import Property, RoomType, Room, Guest, Booking
 
 def load_sample_data():
     print("Loading sample data...")
     
+    hotel = Property.objects.get_or_create(
+        code="main",
+        defaults={'name': "Main Property"}
+    )[0]
+
     # Create room types
     print("Creating room types...")
     
-    standard = RoomType.objects.get_or_create(
+    standard = hotel.room_types.get_or_create(
         name="Standard Single",
         defaults={
             'description': "Comfortable single room with city view and modern amenities",
@@ -25,7 +30,7 @@ def load_sample_data():
         }
     )[0]
 
-    deluxe = RoomType.objects.get_or_create(
+    deluxe = hotel.room_types.get_or_create(
         name="Deluxe Double",
         defaults={
             'description': "Spacious double room with ocean view and premium facilities",
@@ -35,7 +40,7 @@ def load_sample_data():
         }
     )[0]
 
-    suite = RoomType.objects.get_or_create(
+    suite = hotel.room_types.get_or_create(
         name="Premium Suite",
         defaults={
             'description': "Luxury suite with separate living area and exclusive amenities",
@@ -45,7 +50,7 @@ def load_sample_data():
         }
     )[0]
 
-    executive = RoomType.objects.get_or_create(
+    executive = hotel.room_types.get_or_create(
         name="Executive Room",
         defaults={
             'description': "Business-class room with work area and executive lounge access",
@@ -72,7 +77,7 @@ def load_sample_data():
     ]
 
     for room_number, room_type, floor in room_data:
-        Room.objects.get_or_create(
+        hotel.rooms.get_or_create(
             room_number=room_number,
             defaults={
                 'room_type': room_type,
@@ -132,7 +137,7 @@ def load_sample_data():
     ]
 
     for guest_data in sample_guests:
-        Guest.objects.get_or_create(
+        hotel.guests.get_or_create(
             email=guest_data['email'],
             defaults=guest_data
         )
@@ -142,8 +147,8 @@ def load_sample_data():
     # Create sample bookings
     print("Creating sample bookings...")
     
-    guests = list(Guest.objects.all())
-    rooms = list(Room.objects.all())
+    guests = list(hotel.guests.all())
+    rooms = list(hotel.rooms.select_related('room_type'))
     
     # Create bookings for the next 3 months
     start_date = date.today() + timedelta(days=1)
@@ -176,7 +181,7 @@ def load_sample_data():
             status = random.choice(['checked_out', 'checked_out', 'checked_in'])
         
         # Check if room is already booked for these dates
-        overlapping = Booking.objects.filter(
+        overlapping = hotel.bookings.filter(
             room=room,
             status__in=['confirmed', 'checked_in'],
             check_in_date__lt=check_out,
@@ -194,7 +199,7 @@ def load_sample_data():
                 "Airport pickup needed"
             ]
             
-            Booking.objects.get_or_create(
+            hotel.bookings.get_or_create(
                 guest=guest,
                 room=room,
                 check_in_date=check_in,